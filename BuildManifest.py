@@ -0,0 +1,180 @@
+import os
+import json
+import hashlib
+import tempfile
+
+from logger import logger
+
+# 新しく作成するファイルのパーミッション(open()で作成した場合と同じくumaskを反映する)
+# umaskは取得と設定を同時に行うため、インポート時に1回だけ取得する
+UMASK = os.umask(0)
+os.umask(UMASK)
+NEW_FILE_MODE = 0o666 & ~UMASK
+
+class BuildManifest:
+    '''
+    ディシジョンテーブルの作成に使用した入力ファイル・テンプレート・出力ファイルのハッシュ値を
+    フォルダごとに記録し、前回の作成時から変更がないかを判定するクラス
+    '''
+    # 記録形式のバージョン(形式を変更した場合は前回の記録を無効にする)
+    VERSION = 1
+    # ハッシュ値の計算で一度に読み込むバイト数
+    CHUNK_SIZE = 1024 * 1024
+    # ディシジョンテーブルの作成に使用するモジュール(変更した場合は前回の作成結果を使用しない)
+    GENERATOR_MODULES = ('CreateDecisionExcel.py', 'DecisionExcelUtils.py', 'DecisionTableModel.py', 'DirectSheetWriter.py',
+                         'LoadInputFile.py', 'ConvertJsonToDecision.py', 'JsonStreamParser.py', 'EncodingDetector.py',
+                         'TemplateCache.py', 'ExcelConst.py', 'BuildManifest.py')
+    # プロセス内で計算したジェネレーターのバージョン
+    generator_version = None
+
+    '''
+    ファイルのハッシュ値を計算する関数
+    path
+    対象のファイルのパス
+    '''
+    @staticmethod
+    def hash_file(path):
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for raw_data in iter(lambda: file.read(BuildManifest.CHUNK_SIZE), b''):
+                sha256.update(raw_data)
+        return sha256.hexdigest()
+
+    '''
+    ファイルのハッシュ値を取得する関数
+    サイズと更新日時が前回の記録と同じ場合は、ファイルを読み込まずに前回のハッシュ値を使用する
+    path
+    対象のファイルのパス
+    previous
+    前回記録したファイルの情報(ない場合はNone)
+    戻り値
+    {'size':サイズ, 'mtime':更新日時, 'hash':ハッシュ値}
+    '''
+    @staticmethod
+    def stat_file(path, previous=None):
+        stat = os.stat(path)
+        if previous is not None and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns:
+            return previous
+        return {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': BuildManifest.hash_file(path)}
+
+    '''
+    ディシジョンテーブルを作成するツールのバージョンを取得する関数
+    記録形式のバージョンと作成に使用するモジュールのソースのハッシュ値から作成し、プロセス内で1回だけ計算する
+    '''
+    @staticmethod
+    def get_generator_version():
+        if BuildManifest.generator_version is None:
+            sha256 = hashlib.sha256(str(BuildManifest.VERSION).encode('utf-8'))
+            folder = os.path.dirname(os.path.abspath(__file__))
+            for module in BuildManifest.GENERATOR_MODULES:
+                sha256.update(module.encode('utf-8'))
+                sha256.update(BuildManifest.hash_file(os.path.join(folder, module)).encode('utf-8'))
+            BuildManifest.generator_version = sha256.hexdigest()
+        return BuildManifest.generator_version
+
+    '''
+    前回の記録を読み込む関数
+    manifest_path
+    記録ファイルのパス
+    戻り値
+    前回の記録(ない場合、読み込めない場合はNone)
+    '''
+    @staticmethod
+    def load(manifest_path):
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f'作成履歴を読み込めないため、再作成します:{manifest_path}:{e}')
+            return None
+        if manifest.get('version') != BuildManifest.VERSION:
+            return None
+        return manifest
+
+    '''
+    今回の入力ファイルとテンプレートの情報を作成する関数
+    folder
+    フォルダのパス
+    index
+    フォルダのFileNameIndex
+    template_path
+    テンプレートファイルのパス
+    previous
+    前回の記録(ない場合はNone)
+    '''
+    @staticmethod
+    def create(folder, index, template_path, previous=None):
+        previous_inputs = previous['inputs'] if previous is not None else {}
+        inputs = {}
+        for file_name, is_file in index.files:
+            if not is_file or not file_name.lower().startswith(('request_', 'response_')):
+                continue
+            inputs[file_name] = BuildManifest.stat_file(f'{folder}\\{file_name}', previous_inputs.get(file_name))
+
+        previous_template = previous['template'] if previous is not None else None
+        return {
+            'version': BuildManifest.VERSION,
+            'generator': BuildManifest.get_generator_version(),
+            'template': BuildManifest.stat_file(template_path, previous_template),
+            'inputs': inputs,
+        }
+
+    '''
+    前回の作成時からツール・入力ファイル・テンプレート・出力ファイルに変更がないか判定する関数
+    manifest
+    今回の入力ファイルとテンプレートの情報(createの戻り値)
+    previous
+    前回の記録(ない場合はNone)
+    output_path
+    出力ファイルのパス
+    '''
+    @staticmethod
+    def is_up_to_date(manifest, previous, output_path):
+        if previous is None or 'output' not in previous or not os.path.exists(output_path):
+            return False
+
+        # ツールの変更
+        if manifest['generator'] != previous.get('generator'):
+            return False
+        # 入力ファイルの追加・削除・変更
+        if {name: info['hash'] for name, info in manifest['inputs'].items()} != \
+                {name: info['hash'] for name, info in previous['inputs'].items()}:
+            return False
+        # テンプレートの変更
+        if manifest['template']['hash'] != previous['template']['hash']:
+            return False
+        # 作成後に出力ファイルが変更されていないか
+        return BuildManifest.stat_file(output_path, previous['output'])['hash'] == previous['output']['hash']
+
+    '''
+    今回の作成結果を記録する関数
+    同じフォルダの一時ファイルに書き込んでから置き換えるため、中断した場合も書き込み途中の記録が残らない
+    一時ファイルは所有者のみ読み書きできる状態で作成されるため、置き換える前に既存の記録と同じパーミッションを設定する
+    manifest_path
+    記録ファイルのパス
+    manifest
+    今回の入力ファイルとテンプレートの情報(createの戻り値)
+    output_path
+    出力ファイルのパス
+    '''
+    @staticmethod
+    def save(manifest_path, manifest, output_path):
+        manifest = dict(manifest, output=BuildManifest.stat_file(output_path))
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(manifest_path), prefix='.', suffix='.tmp')
+        try:
+            with open(fd, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file, ensure_ascii=False, indent=4)
+            try:
+                mode = os.stat(manifest_path).st_mode & 0o7777
+            except FileNotFoundError:
+                mode = NEW_FILE_MODE
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, manifest_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
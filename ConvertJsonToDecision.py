@@ -4,54 +4,116 @@ import warnings
 import traceback
 
 from logger import logger
+from JsonStreamParser import iter_json_events, build_value
+from EncodingDetector import EncodingDetector
 from pandas.core.reshape import encoding
-from pip._vendor.requests.help import chardet
 
-def conv_data(data, root_key='$'):
+def conv_value(value):
     '''
-    テキストファイルから読み込んだデータの変換処理を行う
-    ディシジョンテーブルに貼り付けるための形式に変換
+    値をディシジョンテーブルに貼り付けるための形式に変換する
+    '''
+    if value is None:
+        return 'null'
+    elif value is False:
+        return 'false'
+    elif isinstance(value, str) and value == '':
+        # 空文字の場合、エクセルに値を貼り付けた際に「''」になる値を設定
+        return '""'
+    return value
+
+def iter_conv_data(data, root_key='$'):
+    '''
+    JSON形式のデータを親階層から順番にたどり、(key名, 値)を1件ずつ返す
+    再帰を使わずにスタックで階層を管理するため、深い階層や大きな配列でも再帰の上限に達しない
+    key名は親階層のkey名を再利用して結合する
     '''
-    def recursive_json(data, root_key='$'):
-        '''
-        JSON形式のデータを再帰的に処理する
-        '''
-        for key, value in data.items():
+    # (親階層のkey名, 子要素のイテレータ, 配列かどうか)
+    stack = [(root_key, iter(data.items()), False)]
+    while stack:
+        parent_key, items, is_list = stack[-1]
+        for key, value in items:
+            if is_list:
+                array_key = f'{parent_key}[{key}]'
+                if isinstance(value, dict):
+                    stack.append((array_key, iter(value.items()), False))
+                    break
+                yield array_key, value
+                continue
+
             # 親階層から順番にkey名を結合
-            temp_key = f'{root_key}.{key}'
+            temp_key = f'{parent_key}.{key}'
             if isinstance(value, dict):
-                recursive_json(value, temp_key)
+                stack.append((temp_key, iter(value.items()), False))
+                break
             elif isinstance(value, list):
                 if len(value) > 0:
-                    for index, item in enumerate(value):
-                        array_key = f'{temp_key}[{index}]'
-                        if isinstance(item, dict):
-                            recursive_json(item, array_key)
-                        else:
-                            output_data[f'{temp_key}[{index}]'] = item
-                else:
-                    output_data[temp_key] = '[]'
-            
+                    stack.append((temp_key, enumerate(value), True))
+                    break
+                yield temp_key, '[]'
+                continue
+
+            value = conv_value(value)
+            if temp_key == '$.result.headDate':
+                yield temp_key, 'YYYY/MM/DD'
+            elif temp_key != '$.result.headtime':
+                yield temp_key, value
+        else:
+            # 子要素をすべて処理した階層を取り除く
+            stack.pop()
+
+def iter_conv_events(events, root_key='$'):
+    '''
+    iter_json_eventsで読み込んだイベントから、iter_conv_dataと同じ(key名, 値)を1件ずつ返す
+    JSON全体を組み立てないため、大きなファイルでもメモリ使用量は階層の深さに比例する
+    トップレベルがオブジェクトでない場合は何も返さない
+    '''
+    event, value = next(events, (None, None))
+    if event != 'start_map':
+        return
+
+    # [親階層のkey名, 配列かどうか, 配列の次のインデックス]
+    stack = [[root_key, False, 0]]
+    key = None
+    for event, value in events:
+        frame = stack[-1]
+        parent_key, is_list, index = frame
+        if event == 'map_key':
+            key = value
+            continue
+        if event in ('end_map', 'end_array'):
+            stack.pop()
+            if is_list and index == 0:
+                # 空の配列
+                yield parent_key, '[]'
+            continue
+
+        if is_list:
+            frame[2] += 1
+            array_key = f'{parent_key}[{index}]'
+            if event == 'start_map':
+                stack.append([array_key, False, 0])
             else:
-                if value is None:
-                    value = 'null'
-                elif value is False:
-                    value = 'false'
+                # 配列内のオブジェクト以外の値はそのまま返す
+                yield array_key, build_value(events, event, value)
+            continue
 
-                if value is '':
-                    value = '""'
-                    # 空文字の場合、エクセルに値を貼り付けた際に「''」になる値を設定
+        # 親階層から順番にkey名を結合
+        temp_key = f'{parent_key}.{key}'
+        if event == 'start_map':
+            stack.append([temp_key, False, 0])
+        elif event == 'start_array':
+            stack.append([temp_key, True, 0])
+        elif temp_key == '$.result.headDate':
+            yield temp_key, 'YYYY/MM/DD'
+        elif temp_key != '$.result.headtime':
+            yield temp_key, conv_value(value)
 
-                if temp_key == '$.result.headDate':
-                    value = 'YYYY/MM/DD'
-                    output_data[temp_key] = value
-                elif temp_key != '$.result.headtime':
-                    output_data[temp_key] = value
-        
-        return output_data
-    
-    output_data = {}
-    return recursive_json(data)
+def conv_data(data, root_key='$'):
+    '''
+    テキストファイルから読み込んだデータの変換処理を行う
+    ディシジョンテーブルに貼り付けるための形式に変換
+    '''
+    return dict(iter_conv_data(data, root_key))
 
 def conv_response_to_decision(path, file_name):
     '''
@@ -65,17 +127,11 @@ def conv_response_to_decision(path, file_name):
     file_path = f'{path}\{file_name}'
     try:
         # ファイルの文字コードを検出
-        with open (file_path, 'rb') as file:
-            raw_data = file.read()
-            result = chardet.detect(raw_data)
-            encoding = result['encoding']
+        encoding = EncodingDetector.detect(file_path)
         
-        # ファイルの読み込み
+        # ファイルを少しずつ読み込みながらデータ変換
         with open(file_path, 'r', encoding=encoding) as file:
-            file_data = file.read()
-            
-        # JSON形式に変換
-        data = json.loads(file_data)
+            output_data = dict(iter_conv_events(iter_json_events(file)))
     except json.JSONDecodeError as e:
         # 読み込んだJSON形式のデータがおかしい場合
         logger.error(f'An error occured while processing {file_path}: {e}')
@@ -86,9 +142,7 @@ def conv_response_to_decision(path, file_name):
         logger.error(f'An error occured while processing {file_path}: {e}')
         logger.error(traceback.format_exc())
         return None, 'ファイル読み込みでエラーが発生しました'
-    
-    # データ変換
-    output_data = conv_data(data)
+
 
     if output_data is None or len(output_data) == 0:
         logger.error(f'データ変換に失敗しました')
@@ -3,16 +3,21 @@ import re
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
+import time
 import ctypes
-import numpy as np
+import configparser
+import openpyxl
 import traceback
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 自作のクラス
 from logger import logger
 from ExcelConst import ExcelConst as const
 from DecisionExcelUtils import DecisionExcelUtils
-from LoadInputFile import LoadInputFile
+from LoadInputFile import LoadInputFile, FileNameIndex
+from BuildManifest import BuildManifest
+from DecisionTableModel import DecisionTableModel
+from DirectSheetWriter import DirectSheetWriter
 
 # メッセージダイアログ
 def outputMsgBox(msg, title):
@@ -20,6 +25,10 @@ def outputMsgBox(msg, title):
     msgbox(0, msg, title, 0x00000000 | 0x00000010 | 0x00040000)
 
 def create_decision_excel(folder):
+    '''
+    フォルダ内のファイルからディシジョンテーブルを作成する
+    エラーがある場合はエラーメッセージを返す
+    '''
     # フォルダ名の取得
     asta_id = os.path.basename(folder).lower()
     
@@ -28,32 +37,50 @@ def create_decision_excel(folder):
     if LoadInputFile.check_exists_decision(folder, f'decision_table_{asta_id}.xlsx'):
         exists_flag = True
     
+    # テンプレートのパス
+    template_path = os.path.abspath(os.path.join(folder, os.pardir))
+    template_path = os.path.join(template_path, const.TEMPLATE_FOLDER_NAME)
+    template_path = os.path.join(template_path, const.TEMPLATE_FILE_NAME)
     if exists_flag:
-        path = os.path.join(folder, f'decison_table_{asta_id}.xlsx')
+        path = os.path.join(folder, f'decision_table_{asta_id}.xlsx')
     else:
         # テンプレートの読み込み
-        template_path = os.path.abspath(os.path.join(folder, os.pardir))
-        template_path = os.path.join(template_path, const.TEMPLATE_FOLDER_NAME)
-        path = os.path.join(template_path, const.TEMPLATE_FILE_NAME)
+        path = template_path
+
+    # フォルダ内のファイル名を一度だけ走査
+    index = FileNameIndex(folder)
+
+    # 入力ファイル・テンプレート・出力ファイルが前回の作成時から変更されていない場合はスキップ
+    output_path = f'{folder}\decision_table_{asta_id}.xlsx'
+    manifest_path = f'{folder}\{const.MANIFEST_FILE_NAME}'
+    previous_manifest = BuildManifest.load(manifest_path)
+    manifest = BuildManifest.create(folder, index, template_path, previous_manifest)
+    if BuildManifest.is_up_to_date(manifest, previous_manifest, output_path):
+        logger.info(f'入力ファイルに変更がないため、スキップします：{folder}')
+        return ''
     
-    excel = DecisionExcelUtils(path, const.SHEET_NAME, exists_flag)
+    excel = DecisionExcelUtils(path, const.SHEET_NAME, exists_flag, get_writer_mode() == 'direct')
 
     # フォルダ内にあるファイルの命名規則をチェック
-    if not LoadInputFile.check_filename(folder):
-        outputMsgBox('エラーがあります、ログを確認してください', 'エラー')
-        return
+    if not LoadInputFile.check_filename(folder, index):
+        return 'エラーがあります、ログを確認してください'
     
     # リクエスト用、レスポンス用のファイルからデータを取得
-    request_data, response_data, case_num, api_num, message = LoadInputFile.create_data(folder)
-    if message != '':
-        outputMsgBox(message,'エラー')
-        return
-    
-    request_list = [ defaultdict(list) for i in range(api_num)]
-    response_list = [[ defaultdict(list) for j in range(case_num)] for i in range(api_num)]
+    load_worker_num, load_worker_type = get_load_worker()
+    start_case = 0
     if exists_flag:
         # ディシジョンテーブルに記載されているケース数のチェックと取得
+        api_num, case_num = LoadInputFile.count_maxcase_maxapi(index)
         orginal_case_num = excel.check_case_count(case_num)
+        # ディシジョンテーブルに記載されていない追加分のケースのファイルのみ読み込む
+        start_case = orginal_case_num
+    folder_data = LoadInputFile.load_folder(folder, index, load_worker_num, load_worker_type, start_case)
+    if folder_data.message != '':
+        return folder_data.message
+    request_data, response_data = folder_data.request_data, folder_data.response_data
+    case_num, api_num = folder_data.case_num, folder_data.api_num
+    
+    if exists_flag:
         # ディシジョンテーブルに記載されているリクエストパラメータを取得
         request_data = [[{} for j in range(api_num)] for i in range(case_num)]
         request_data = excel.get_param_list(case_num, api_num, request_data, const.AREA_NAME_REQUEST)
@@ -61,31 +88,11 @@ def create_decision_excel(folder):
         response_data = [['' for j in range(api_num)] for i in range(case_num)]
         response_data = excel.get_param_list(case_num, api_num, response_data, const.AREA_NAME_RESPONSE)
         # ファイルから取得したパラメータの追加
-        request_data, response_data = LoadInputFile.load_data(folder, orginal_case_num, case_num, api_num, request_data, response_data)
-
-    # ケース数分、ループ処理
-    for i, case_object in enumerate(request_data, start=0):
-        # APIの呼び出し回数分、ループ処理
-        for j, api_object in enumerate(case_object, start=0):
-            if api_object is None or len(api_object) == 0:
-                continue
-
-            # リクエストパラメータ(Key項目)、ループ処理
-            for (key, list_value) in api_object.items():
-                for idx, value in enumerate(list_value, start=0):
-                    if key not in request_list[j] or (len(request_list[j][key]) == 0 or value not in request_list[j][key]):
-                        request_list[j][key].append(value)
-
-    # ケース数分、ループ処理
-    for i , case_object in enumerate(response_data, start=0):
-        # APIの呼び出し回数分、ループ処理
-        for j, api_object in enumerate(case_object, start=0):
-            if api_object is None or len(api_object) == 0:
-                continue
-
-            # リクエストパラメータ(Key項目数分)、ループ処理
-            for(key, value) in api_object.items():
-                    response_list[j][i][key].append(value)
+        request_data, response_data = LoadInputFile.load_data(folder, orginal_case_num, case_num, api_num, request_data, response_data, folder_data)
+
+    # APIごとにパラメータを集計し、●付けとあわせてモデルにまとめる
+    # 以降のエクセルの編集はモデルから行う
+    model = DecisionTableModel.from_folder_data(request_data, response_data, case_num, api_num)
 
     if api_num > 1 and not exists_flag:
         # APIの呼び出し回数が1回より多い場合、かつ新規作成の場合にASTAIDやURL等の行を複製
@@ -95,9 +102,9 @@ def create_decision_excel(folder):
     excel.edit_case_input_area(case_num)
 
     # 各APIのリクエストパラメータを記載する行の行数を調整する
-    excel.increase_decrease_named_area_lines(request_list, const.AREA_NAME_REQUEST, 1)
+    excel.increase_decrease_named_area_lines(model, const.AREA_NAME_REQUEST, 1)
     # 各APIのレスポンスを記載する行の行数を調整する
-    excel.increase_decrease_named_area_lines(response_list, const.AREA_NAME_RESPONSE, 1)
+    excel.increase_decrease_named_area_lines(model, const.AREA_NAME_RESPONSE, 1)
     # ●付けエリアを初期化
     target_list = []
     target_list.append(const.AREA_NAME_REQUEST)
@@ -105,9 +112,9 @@ def create_decision_excel(folder):
     #target_list.append(const.AREA_NAME_DECISION)
     excel.clear_decision_area(target_list)
     # リクエストパラメータをエクセルに設定
-    excel.edit_request_param(request_list, request_data, const.AREA_NAME_REQUEST)
+    excel.edit_request_param(model, const.AREA_NAME_REQUEST)
     # レスポンスパラメータをエクセルに設定
-    excel.edit_response_param(response_list, const.AREA_NAME_RESPONSE)
+    excel.edit_response_param(model, const.AREA_NAME_RESPONSE)
 
     # ケース番号とスクリプト番号の入力
     excel.input_case_no(case_num, api_num)
@@ -115,7 +122,83 @@ def create_decision_excel(folder):
     excel.create_case_condition_rules(case_num, api_num)
 
     # ファイルを保存
-    excel.save_book(f'{folder}\decision_table_{asta_id}.xlsx')
+    excel.save_book(output_path)
+    # 作成結果を記録
+    BuildManifest.save(manifest_path, manifest, output_path)
+    return ''
+
+def run_create_decision_excel(folder):
+    '''
+    1フォルダ分のディシジョンテーブルを作成し、処理結果を返す
+    プロセスプールから呼び出されるため、メッセージダイアログは表示しない
+    '''
+    start = time.perf_counter()
+    error = ''
+    try:
+        message = create_decision_excel(folder)
+    except Exception as e:
+        message = str(e)
+        error = traceback.format_exc()
+
+    return {
+        'folder': folder,
+        'success': message == '',
+        'elapsed': time.perf_counter() - start,
+        'message': message,
+        'traceback': error,
+    }
+
+def output_result(result):
+    '''
+    フォルダ単位の処理結果をログに出力する
+    '''
+    if result['success']:
+        logger.info(f'成功：{result["folder"]}（{result["elapsed"]:.2f}秒）')
+        return
+
+    logger.error(f'失敗：{result["folder"]}（{result["elapsed"]:.2f}秒）')
+    logger.error(result['message'])
+    if result['traceback'] != '':
+        logger.error('----------------------------------')
+        logger.error(result['traceback'])
+        logger.error('----------------------------------')
+    logger.error('')
+
+def get_worker_num(key='CreateWorkerNum'):
+    '''
+    config.iniから並列処理のプロセス数を取得する
+    未設定の場合は1(直列処理)、0以下の場合はCPU数とする
+    '''
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    worker_num = config['DEFAULT'].getint(key, fallback=1)
+    if worker_num <= 0:
+        worker_num = os.cpu_count() or 1
+    return worker_num
+
+def get_load_worker():
+    '''
+    config.iniからリクエスト用・レスポンス用のファイルを並列に読み込む数と方法を取得する
+    方法は'thread'(スレッド)または'process'(プロセス)、未設定の場合は'thread'とする
+    '''
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    worker_type = config['DEFAULT'].get('LoadWorkerType', fallback='thread').strip().lower()
+    return get_worker_num('LoadWorkerNum'), worker_type
+
+def get_writer_mode():
+    '''
+    config.iniからディシジョンテーブルの保存方法を取得する
+    'openpyxl'(ブック全体のセルを作成して保存)または'direct'(追加した行のセルを作成せず、保存時に書き込む)
+    未設定の場合、ダイレクト出力モードに対応していないopenpyxlのバージョンの場合は'openpyxl'とする
+    '''
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    mode = config['DEFAULT'].get('CreateWriterMode', fallback='openpyxl').strip().lower()
+    if mode == 'direct' and not DirectSheetWriter.is_supported():
+        logger.warning(f'openpyxl {openpyxl.__version__}はダイレクト出力モードに対応していないため、openpyxlで保存します')
+        return 'openpyxl'
+    return mode
 
 def main():
     '''
@@ -130,26 +213,50 @@ def main():
     # 正規表現パターン
     pattern = re.compile(target_name, re.IGNORECASE)
 
-    # フォルダ数分、ループ処理を行う
+    # 対象フォルダの一覧を取得
+    target_list = []
     for temp in os.listdir(input_directory):
         path = os.path.join(input_directory, temp)
         if os.path.isdir(path) and pattern.search(temp):
-            try:
-                create_decision_excel(path)
-            except Exception as e:
-                logger.error(str(e))
-                logger.error(f'対象：{path}')
-                logger.error('----------------------------------')
-                logger.error(traceback.format_exc())
-                logger.error('----------------------------------')
-                logger.error('')
-                logger.error('')
-                logger.error('')
-                logger.error('')
-                logger.error('')
-                logger.error('')
-                outputMsgBox('エラーがあります、ログを確認してください', 'エラー')
-                continue
+            target_list.append(path)
+
+    worker_num = get_worker_num()
+    if worker_num <= 1 or len(target_list) <= 1:
+        # フォルダ数分、ループ処理を行う
+        results = [run_create_decision_excel(path) for path in target_list]
+    else:
+        # フォルダ単位でプロセスプールに処理を割り当てる
+        start = time.perf_counter()
+        results_by_folder = {}
+        with ProcessPoolExecutor(max_workers=worker_num) as executor:
+            futures = {executor.submit(run_create_decision_excel, path): path for path in target_list}
+            for future in as_completed(futures):
+                folder = futures[future]
+                try:
+                    results_by_folder[folder] = future.result()
+                except Exception as e:
+                    # ワーカーの異常終了等で処理結果を受け取れない場合も、フォルダ単位の失敗として出力する
+                    results_by_folder[folder] = {
+                        'folder': folder,
+                        'success': False,
+                        'elapsed': time.perf_counter() - start,
+                        'message': f'処理結果を取得できませんでした：{type(e).__name__}: {e}',
+                        'traceback': traceback.format_exc(),
+                    }
+        results = [results_by_folder[path] for path in target_list]
+
+    # フォルダ単位の処理結果を出力
+    err_flag = False
+    for result in results:
+        output_result(result)
+        if not result['success']:
+            err_flag = True
+
+    success_num = len(results) - len([result for result in results if not result['success']])
+    logger.info(f'処理結果：成功 {success_num}件 / 失敗 {len(results) - success_num}件')
+
+    if err_flag:
+        outputMsgBox('エラーがあります、ログを確認してください', 'エラー')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -13,10 +13,12 @@ import traceback
 from distutils.util import strtobool
 import ctypes
 import shutil
+import multiprocessing
 from pip._vendor.requests.help import chardet
 
-# ロギング設定
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', filemode='w', filename='error_CreateDecisonTable.log', encoding='utf-8')
+# ロギング設定(並列処理の子プロセスではログファイルを上書きしない)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                    filemode='w' if multiprocessing.parent_process() is None else 'a', filename='error_CreateDecisonTable.log', encoding='utf-8')
 logger = logging.getLogger()
 warnings.simplefilter(action='ignore', category=UserWarning)
 
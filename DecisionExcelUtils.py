@@ -6,18 +6,23 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
 import numpy as np
 from copy import copy
-from typing import Set, Dict 
+from typing import Dict 
 
 import openpyxl
 from openpyxl.workbook.defined_name import DefinedName
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import CellIsRule
+from openpyxl.formatting.formatting import ConditionalFormatting, ConditionalFormattingList
+from openpyxl.worksheet.cell_range import CellRange, MultiCellRange
 from openpyxl.styles import PatternFill, Border, Side
 from openpyxl.utils import range_boundaries, get_column_letter
+from openpyxl.cell.cell import Cell
 
-from CreateDecisionTable import outputMsgBox
 from logger import logger 
 from ExcelConst import ExcelConst as const 
+from TemplateCache import TemplateCache
+from DecisionTableModel import DecisionTableModel
+from DirectSheetWriter import DirectSheetWriter, VirtualRows
 
 class DecisionExcelUtils:
     # ブックのオブジェクト
@@ -26,6 +31,12 @@ class DecisionExcelUtils:
     ws = None
     # 既存フラグ
     exists_flag = False
+    # 名前付き範囲の一覧（名前：(種類, 何回目のAPIか, 境界)）
+    named_areas = None
+    # ダイレクト出力モード（追加した行のセルを作成せず、保存時に書き込む）
+    direct_flag = False
+    # ダイレクト出力モードで追加した行（VirtualRowsのリスト）
+    virtual_rows = None
 
     # コンストラクタ
     def __init__(self, template_path, sheet_name):
@@ -40,17 +51,103 @@ class DecisionExcelUtils:
         self.ws = ws
 
     # コンストラクタ
-    def __init__(self, template_path, sheet_name, exists_flag):
+    def __init__(self, template_path, sheet_name, exists_flag, direct_flag=False):
         # テンプレートファイルの存在チェック
         if not os.path.exists(template_path):
             raise FileNotFoundError(f'templateファイルが存在しません')
         
-        wb = openpyxl.load_workbook(template_path)
+        if exists_flag:
+            # 既存のディシジョンテーブルはそのまま読み込む
+            wb = openpyxl.load_workbook(template_path)
+            named_areas = DecisionExcelUtils.create_named_area_index(wb)
+        else:
+            # テンプレートはキャッシュから複製する
+            wb, named_areas = TemplateCache.load(template_path, DecisionExcelUtils.create_named_area_index)
         ws = wb[sheet_name]
 
         self.wb = wb
         self.ws = ws
         self.exists_flag = exists_flag
+        self.named_areas = named_areas
+        self.direct_flag = direct_flag
+        self.virtual_rows = []
+
+    '''
+    名前付き範囲の一覧を作成する関数
+    テーブル形式の名前付き範囲は対象外
+    wb
+    ブックのオブジェクト
+    戻り値
+    名前：(種類, 何回目のAPIか, (最小列, 最小行, 最大列, 最大行))
+        種類は名前の末尾の数字を除いたもの、何回目のAPIかは末尾の数字-1（数字がない場合はNone）
+    '''
+    @staticmethod
+    def create_named_area_index(wb):
+        named_areas = {}
+        for name, defined_name in wb.defined_names.items():
+            # 名前付き範囲がテーブル形式の場合はスキップ
+            match = re.search(r'.*\[.*\].*', defined_name.attr_text)
+            if match:
+                continue
+
+            # 名前付き範囲を種類と何回目のAPIかに分割
+            kind, api_idx = DecisionExcelUtils.split_area_name(name)
+
+            for title, coord in defined_name.destinations:
+                named_areas[name] = (kind, api_idx, range_boundaries(coord))
+        return named_areas
+
+    '''
+    名前付き範囲の名前を種類と何回目のAPIかに分割する関数
+    name
+    名前付き範囲の名前
+    戻り値
+    (種類, 何回目のAPIか)
+        末尾の数字がない場合は(名前, None)
+    '''
+    @staticmethod
+    def split_area_name(name):
+        # 末尾の数字は何回目のAPIのパラメータかを示している
+        result = re.match(r'(\D+)(\d+)$', name)
+        if result:
+            return result.group(1), int(result.group(2)) - 1
+        return name, None
+
+    '''
+    種類が一致する名前付き範囲の名前の一覧を取得する関数
+    kind
+    名前付き範囲の種類（名前の末尾の数字を除いたもの）
+    '''
+    def get_named_area_names(self, kind):
+        return [name for name, (area_kind, api_idx, bounds) in self.named_areas.items() if area_kind == kind]
+
+    '''
+    名前付き範囲の境界を更新する関数
+    インデックスのみを更新し、ブックへの反映はsave_bookで行う
+    name
+    名前付き範囲の名前（存在しない場合は追加）
+    bounds
+    (最小列, 最小行, 最大列, 最大行)
+    '''
+    def set_named_area(self, name, bounds):
+        if name in self.named_areas:
+            kind, api_idx, old_bounds = self.named_areas[name]
+        else:
+            kind, api_idx = DecisionExcelUtils.split_area_name(name)
+        self.named_areas[name] = (kind, api_idx, tuple(bounds))
+
+    '''
+    名前付き範囲のインデックスをブックに反映する関数
+    境界が変わった名前付き範囲、追加した名前付き範囲のみ更新する
+    '''
+    def write_named_areas(self):
+        for name, (kind, api_idx, bounds) in self.named_areas.items():
+            min_col, min_row, max_col, max_row = bounds
+            new_coord = f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row}'
+            if name not in self.wb.defined_names:
+                self.wb.defined_names.add(DefinedName(name, attr_text=new_coord))
+            elif self.get_min_to_max_coord(self.wb.defined_names[name].destinations) != bounds:
+                self.wb.defined_names[name].attr_text = new_coord
 
     def get_min_to_max_coord(self, destinations):
         for title, coord in destinations:
@@ -64,13 +161,10 @@ class DecisionExcelUtils:
     '''
 
     def edit_case_input_area(self, case_num):
-        temp_names = copy(self.wb.defined_names)
-        for name, defined_name in temp_names.items():
-            if const.AREA_NAME_CASEAREA not in defined_name.name:
-                # 名前付き範囲が「ケースエリア」以外の場合はスキップ
-                continue
+        # 名前付き範囲「ケースエリア」を処理
+        for name in self.get_named_area_names(const.AREA_NAME_CASEAREA):
             # 最小・最大の行番号・列番号を取得
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(list(defined_name.destinations))
+            min_col, min_row, max_col, max_row = self.named_areas[name][2]
 
             # 行数を取得
             col_num = max_col - min_col + 1
@@ -83,9 +177,8 @@ class DecisionExcelUtils:
                 add_num = case_num - col_num
                 # 処理するエリアを取得
                 target_area = list(self.ws.iter_rows(min_col=max_col, max_col=max_col, min_row=min_row, max_row=max_row, values_only=False))
-                # 行を追加
-                for i in range(0, add_num):
-                    self.add_cols(target_area, max_col + 1, True)
+                # 列を一括で追加
+                self.add_cols_bulk(target_area, max_col + 1, add_num)
     
     '''
         ASTAIDやURLを記載するエリアを追加する関数
@@ -110,10 +203,8 @@ class DecisionExcelUtils:
             self.add_rows(title_area, 5 + add_row_num, False)
             # 追加した行数
             # APIのリクエストとレスポンスを記載している行をコピー
-            # 名前付き範囲を取得
-            named_range = self.wb.defined_names[f'{const.AREA_NAME_API}{i+1}']
-            # 範囲の境界を取得
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(named_range.destinations)
+            # 名前付き範囲の境界を取得
+            min_col, min_row, max_col, max_row = self.named_areas[f'{const.AREA_NAME_API}{i+1}'][2]
             # APIのリクエストやレスポンスを記載するエリアを取得
             api_area = list(self.ws.iter_rows(min_row=min_row, max_row=max_row, values_only=False))
             # 追加する行数
@@ -123,50 +214,32 @@ class DecisionExcelUtils:
 
     '''
         名前付き範囲の行数えお追加・削除する処理
-        param_list
-        名前付き範囲に記載するパラメータの一覧
+        model
+        名前付き範囲に記載するパラメータのDecisionTableModel
         target_area_name
         対象の名前付き範囲
         padding_num
         追加する位置（0の場合名前付き範囲の最初の行の位置から行を追加・削除する）
     '''
 
-    def increase_decrease_named_area_lines(self, param_list, target_area_name, padding_num):
-        temp = copy(self.wb.defined_names)
-        for name, defined_name in temp.items():
-            if target_area_name not in defined_name.name:
-                # リクエストパラメータを記載する行以外はスキップ
-                continue
-
-            # 名前付き範囲「リクエストパラメータエリア」の末尾の数字を取得
-            # 末尾の数字は何回目のAPIのパラメータかを示している
-            result = re.match(r'(\D+)(\d+)', name)
-            if result:
-                pattern1, pattern2 = result.groups()
-                param_idx = int(pattern2)
-                if param_idx > 0:
-                    param_idx = param_idx - 1
-
-            else:
-                logger.error(f'テンプレートファイルの名前付き範囲が更新されています、確認してください')
-                outputMsgBox('エラーがあります、ログを確認してください','エラー')
-                return
+    def increase_decrease_named_area_lines(self, model, target_area_name, padding_num):
+        for name in self.get_named_area_names(target_area_name):
+            # 名前付き範囲「リクエストパラメータエリア」の末尾の数字から何回目のAPIかを取得
+            kind, param_idx, bounds = self.named_areas[name]
+            if param_idx is None:
+                # 並列処理のワーカーでダイアログを表示しないよう、フォルダの処理結果としてエラーを返す
+                raise Exception(f'テンプレートファイルの名前付き範囲が更新されています、確認してください:{name}')
             
             # 範囲の境界を取得
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(list(defined_name.destinations))
+            min_col, min_row, max_col, max_row = bounds
             
             param_size = 0
             if const.AREA_NAME_REQUEST in target_area_name:
                 # リクエストパラメータの場合の処理
-                for key, value_list in param_list[param_idx].items():
-                    for value in value_list:
-                        param_size += 1
+                param_size = model.row_count(DecisionTableModel.REQUEST, param_idx)
             elif const.AREA_NAME_RESPONSE in target_area_name:
-                # レスポンスパラメータの場合の処理
-                for api_res_object in param_list[param_idx]:
-                    for key, value in api_res_object.items():
-                        if key != "":
-                            param_size += 1
+                # レスポンスパラメータの場合の処理(key名が空の行は数えない)
+                param_size = model.row_count(DecisionTableModel.RESPONSE, param_idx, skip_key="")
             
             # 行を追加
             row_num = max_row - min_row + 1
@@ -176,154 +249,212 @@ class DecisionExcelUtils:
                 # 処理するエリアを取得
                 target_area = list(self.ws.iter_rows(min_row=min_row+padding_num, max_row=min_row+padding_num, values_only=False))
                 
-                # 行を追加
-                for i in range(0, add_num):
-                    self.add_rows(target_area, min_row + padding_num, False)
+                # 行を一括で追加
+                self.add_rows_bulk(target_area, min_row + padding_num, add_num)
             elif row_num > param_size:
                 delete_num = row_num - param_size
-                # 処理するエリアを取得
-                target_area = list(self.ws.iter_rows(min_row=min_row+padding_num, max_row=min_row+padding_num, values_only=False))
                 
-                # 行を削除
-                for i in range(0, delete_num):
-                    self.delete_rows(target_area, min_row)
+                # 行を一括で削除
+                self.delete_rows_bulk(min_row, delete_num)
     
     '''
     リクエストパラメータの設定をする関数
-    param_list
-    パラメータリスト
+    model
+    パラメータのDecisionTableModel
     target_area_name
     名前付き範囲
     '''
     
-    def edit_request_param(self, param_list, request_data, target_area_name):
-        for name, defined_name in self.wb.defined_names.items():
-            if target_area_name not in defined_name.name:
-                # target_area_nameの行はスキップ
-                continue
-
-            # 名前付き範囲「リクエストパラメータエリア」の末尾の数字を取得    
-            # 末尾の数字は何回目のAPIのパラメータかを示している
-            result = re.match(r'(\D+)(\d+)', name)
-            if result:
-                pattern1, pattern2 = result.groups()
-                param_idx = int(pattern2)
-                if param_idx > 0:
-                    param_idx = param_idx - 1
-            else:
-                logger.error(f'テンプレートファイルの名前付き範囲が更新されています、確認してください')
-                outputMsgBox('エラーがあります、ログを確認してください','エラー')
-                return
+    def edit_request_param(self, model, target_area_name):
+        for name in self.get_named_area_names(target_area_name):
+            # 名前付き範囲「リクエストパラメータエリア」の末尾の数字から何回目のAPIかを取得
+            kind, param_idx, bounds = self.named_areas[name]
+            if param_idx is None:
+                # 並列処理のワーカーでダイアログを表示しないよう、フォルダの処理結果としてエラーを返す
+                raise Exception(f'テンプレートファイルの名前付き範囲が更新されています、確認してください:{name}')
             
             # 最小行と最大行を取得
-            named_range = self.wb.defined_names[defined_name.name]
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(named_range.destinations)
+            min_col, min_row, max_col, max_row = bounds
 
-            # パラメータの総数を取得
-            param_size = 0
-            for key, value_list in param_list[param_idx].items():
-                for value in value_list:
-                    param_size += 1
-            
-            # キーと値のリストを作成
-            key_list = []
-            value_list = []
-            for key, values in param_list[param_idx].items():
-                for value in values:
-                    key_list.append(key)
-                    value_list.append(value)
+            # キーと値のリストを取得
+            key_list, value_list = model.section_params(DecisionTableModel.REQUEST, param_idx)
+            start, end = model.section(DecisionTableModel.REQUEST, param_idx)
             
             # マージ後のリクエストパラメータ数文、ループ
             for i in range(0, len(key_list)):
                 # キー名を設定
-                key_cell = self.ws.cell(row=i + min_row, column=const.INPUT_KEY_COL)
-                key_cell.value = key_list[i]
+                self.set_cell_value(i + min_row, const.INPUT_KEY_COL, key_list[i])
                 # 値を設定
-                value_cell = self.ws.cell(row=i + min_row, column=const.INPUT_VALUE_COL)
-                value_cell.value = value_list[i]
+                self.set_cell_value(i + min_row, const.INPUT_VALUE_COL, value_list[i])
 
-                for case_num, case_object in enumerate(request_data, start=0):
-                    if request_data[case_num][param_idx] is None:
-                        continue
-                    for key, values in request_data[case_num][param_idx].items():
-                        for value in values:
-                            if key == key_list[i] and value == value_list[i]:
-                                # ●付け
-                                decision_cell = self.ws.cell(row=i + min_row, column=const.INPUT_AREA_COL + case_num)
-                                decision_cell.value ='●'
+            # ケースごとに●が付いている行のみ●付け
+            for case_num in range(model.case_num):
+                for row in model.case_rows(case_num, DecisionTableModel.REQUEST, param_idx):
+                    self.set_cell_value(int(row) - start + min_row, const.INPUT_AREA_COL + case_num, '●')
     
     '''
     レスポンスパラメータの設定する関数
-    param_list
-    パラメータリスト
+    model
+    パラメータのDecisionTableModel
     target_area_name
     名前付き範囲
     '''
-    def edit_response_param(self, param_list, target_area_name):
-        temp = copy(self.wb.defined_names)
-        for name, defined_name in temp.items():
-            if target_area_name not in defined_name.name:
-                # target_area_nameの行以外はスキップ
-                continue
-
-            # 名前付き範囲「リクエストパラメータエリア」の末尾の数字を取得
-            # 末尾の数字は何回目のAPIのパラメータかを示している
-            result = re.match(r'(\D+)(\d+)', name)
-            if result:
-                pattern1, pattern2 = result.groups()
-                param_idx = int(pattern2)
-                if param_idx > 0:
-                    param_idx = param_idx - 1
-            else:
-                logger.error(f'テンプレートファイルの名前付き範囲が更新されています、確認してください')
-                outputMsgBox('エラーがあります、ログを確認してください','エラー')
-                return
+    def edit_response_param(self, model, target_area_name):
+        for name in self.get_named_area_names(target_area_name):
+            # 名前付き範囲「レスポンスパラメータエリア」の末尾の数字から何回目のAPIかを取得
+            kind, param_idx, bounds = self.named_areas[name]
+            if param_idx is None:
+                # 並列処理のワーカーでダイアログを表示しないよう、フォルダの処理結果としてエラーを返す
+                raise Exception(f'テンプレートファイルの名前付き範囲が更新されています、確認してください:{name}')
             
             # 最小行と最大行を取得
-            named_range = self.wb.defined_names[defined_name.name]
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(named_range.destinations)
+            min_col, min_row, max_col, max_row = bounds
 
             # ケース数分、ループ処理
             param_cnt = 0
-            for case_num, api_object in enumerate(param_list[param_idx], start=0):
-                if len(api_object) == 0:
+            for case_num in range(model.case_num):
+                rows = model.case_rows(case_num, DecisionTableModel.RESPONSE, param_idx)
+                if len(rows) == 0:
                     # レスポンスがないため、次のケースのレスポンスを処理
                     continue
                 # レスポンスパラメータ数文、ループ処理
-                for key, value in api_object.items():
+                for key, value in (model.row(row) for row in rows):
 
                     if key == '$.status':
                         # KEY名が「＄.status」の場合、テンプレートファイルに存在しているので、
                         # テンプレートファイルの該当箇所に●付け
-                        if value[0] == self.ws.cell(row=min_row -2, column=min_col +3).value:
+                        if value == self.get_cell_value(min_row -2, min_col +3):
                             # SUCCESSの場合
-                            self.ws.cell(row=min_row -2, column=const.INPUT_AREA_COL + case_num).value = '●'
+                            self.set_cell_value(min_row -2, const.INPUT_AREA_COL + case_num, '●')
                             # レスポンスパラメータを記載する行を1行削除
                             self.delete_line(min_row + param_cnt)
 
                             continue
-                        elif value[0] == self.ws.cell(row=min_row -1, column=min_col +3).value:
+                        elif value == self.get_cell_value(min_row -1, min_col +3):
                             # VALIDATION_FAILUREの場合
-                            self.ws.cell(row=min_row -1, column=const.INPUT_AREA_COL + case_num).value = '●'
+                            self.set_cell_value(min_row -1, const.INPUT_AREA_COL + case_num, '●')
                             # レスポンスパラメータを記載する行を1行削除
                             self.delete_line(min_row + param_cnt)
 
                             continue
                     
                     # key名を設定
-                    self.ws.cell(row=min_row + param_cnt, column=const.INPUT_KEY_COL).value = key
+                    self.set_cell_value(min_row + param_cnt, const.INPUT_KEY_COL, key)
                     # valueを設定
-                    self.ws.cell(row=min_row + param_cnt, column=const.INPUT_VALUE_COL).value = value[0]
+                    self.set_cell_value(min_row + param_cnt, const.INPUT_VALUE_COL, value)
                     # ●付け
-                    self.ws.cell(row=min_row + param_cnt, column=const.INPUT_AREA_COL + case_num).value = '●'
+                    self.set_cell_value(min_row + param_cnt, const.INPUT_AREA_COL + case_num, '●')
                     param_cnt += 1
     
     def delete_line(self, row):
         # 処理するエリアを取得
-        target_area = list(self.ws.iter_rows(min_row=row+1, max_row=row+1, values_only=False))
+        if self.direct_flag:
+            # ダイレクト出力モードでは追加した行のセルを作成しないよう、範囲の両端のセルのみを使用する
+            # シート上のセルは行削除で1行上に移動するため、移動後の行のセルとする
+            target_area = [[Cell(self.ws, row=row, column=1), Cell(self.ws, row=row, column=self.ws.max_column)]]
+        else:
+            target_area = list(self.ws.iter_rows(min_row=row+1, max_row=row+1, values_only=False))
         # 行削除
         self.delete_rows(target_area, row)
 
+    '''
+    ダイレクト出力モードで追加した行から、指定した行を含むものを取得する関数
+    戻り値
+    (VirtualRows, 最初の行からの位置)、含まれない場合は(None, None)
+    '''
+    def find_virtual_row(self, row):
+        for rows in self.virtual_rows:
+            if rows.start_row <= row <= rows.end_row:
+                return rows, row - rows.start_row
+        return None, None
+
+    '''
+    セルの値を取得する関数
+    ダイレクト出力モードで追加した行の場合はセルを作成せずに値を取得する
+    '''
+    def get_cell_value(self, row, column):
+        rows, offset = self.find_virtual_row(row)
+        if rows is not None and (row, column) not in self.ws._cells:
+            return rows.get_value(offset, column)
+        return self.ws.cell(row=row, column=column).value
+
+    '''
+    セルに値を設定する関数
+    ダイレクト出力モードで追加した行の場合はセルを作成せずに値のみを保持する
+    '''
+    def set_cell_value(self, row, column, value):
+        rows, offset = self.find_virtual_row(row)
+        if rows is not None and (row, column) not in self.ws._cells:
+            rows.set_value(offset, column, value)
+            return
+        self.ws.cell(row=row, column=column).value = value
+
+    '''
+    行を挿入する関数
+    ダイレクト出力モードで追加した行も挿入した行数分ずらす
+    start_row
+    挿入する位置
+    amount
+    挿入する行数
+    '''
+    def insert_sheet_rows(self, start_row, amount):
+        if self.direct_flag:
+            self.move_sheet_cells(start_row, amount)
+        else:
+            self.ws.insert_rows(start_row, amount=amount)
+        for rows in list(self.virtual_rows):
+            if rows.start_row < start_row <= rows.end_row:
+                # 追加した行の途中に挿入する場合は、挿入する位置で分割する
+                self.virtual_rows.append(rows.split(start_row - rows.start_row))
+        for rows in self.virtual_rows:
+            if rows.start_row >= start_row:
+                rows.start_row += amount
+
+    '''
+    指定した行以降のセルを移動する関数
+    openpyxlのinsert_rows・delete_rowsは移動する範囲のセルをすべて作成するため、
+    ダイレクト出力モードでは作成済みのセルのみを移動する
+    min_row
+    移動する最初の行
+    offset
+    移動する行数（負の値の場合は上に移動）
+    '''
+    def move_sheet_cells(self, min_row, offset):
+        keys = sorted((key for key in self.ws._cells if key[0] >= min_row), reverse=offset > 0)
+        for row, column in keys:
+            self.ws._move_cell(row, column, offset, 0)
+        self.ws._current_row = self.ws.max_row if self.ws._cells else 0
+
+    '''
+    行を削除する関数
+    ダイレクト出力モードで追加した行も削除し、削除した行数分ずらす
+    start_row
+    削除する位置
+    amount
+    削除する行数
+    '''
+    def delete_sheet_rows(self, start_row, amount):
+        end_row = start_row + amount - 1
+        if self.direct_flag:
+            for key in [key for key in self.ws._cells if start_row <= key[0] <= end_row]:
+                del self.ws._cells[key]
+            self.move_sheet_cells(end_row + 1, -amount)
+        else:
+            self.ws.delete_rows(start_row, amount)
+        for rows in list(self.virtual_rows):
+            if rows.end_row < start_row:
+                continue
+            if rows.start_row > end_row:
+                rows.start_row -= amount
+                continue
+            # 削除する範囲と重なっている行を削除
+            first = max(start_row, rows.start_row) - rows.start_row
+            last = min(end_row, rows.end_row) - rows.start_row
+            rows.delete(first, last - first + 1)
+            rows.start_row = min(rows.start_row, start_row)
+            if len(rows) == 0:
+                self.virtual_rows.remove(rows)
+
     '''
     行追加により入力規則の範囲がずれる場合、
     本関数を使用して入力規則の範囲を追加した行数分ずらす関数
@@ -481,54 +612,42 @@ class DecisionExcelUtils:
     '''
 
     def edit_named_range(self, source, end_line_flag, edit, mode):
+        # 追加する行が何行目かを取得
+        src_min_row = source[0][0].row
+        src_max_row = source[len(source) -1][0].row
+        src_min_col = source[0][0].column
+        src_max_col = source[0][len(source[0]) -1].column
+
         # 名前付き範囲の処理
-        temp_defined_names = copy(self.wb.defined_names)
-        for name, defined_name in temp_defined_names.items():
-            # 名前付き範囲がテーブル形式の場合はスキップ
-            match = re.search(r'.*\[.*\].*', defined_name.attr_text)
-            if match:
-                continue
+        # 要素数が変わる可能性があり、ループ処理の途中で変わってしまうとエラーになる
+        # ループ自体はコピーしたオブジェクトを使用
+        for name, (kind, api_idx, bounds) in list(self.named_areas.items()):
+            # 名前付き範囲の境界を取得
+            min_col, min_row, max_col, max_row = bounds
 
-            destinations = list(defined_name.destinations)
-            for title, coord in destinations:
-                # 名前付き範囲の境界を取得
-                min_col, min_row, max_col, max_row = range_boundaries(coord)
-                # 追加する行が何行目かを取得
-                src_min_row = source[0][0].row
-                src_max_row = source[len(source) -1][0].row
-                src_min_col = source[0][0].column
-                src_max_col = source[0][len(source[0]) -1].column
-
-                if edit == 'row' and not end_line_flag:
-                    new_coord = self.calc_rows_range(min_row, max_row, min_col, max_col, src_min_row, src_max_row, mode)
-                    self.wb.defined_names[name].attr_text = f'{new_coord}'
-                elif edit == 'col' and not end_line_flag:
-                    # 名前付き範囲を名前と末尾の数字に分割
-                    new_coord = self.calc_cols_range(min_row, max_row, min_col, max_col, src_min_row, src_max_row, mode)
-                    self.wb.defined_names[name].attr_text = f'{new_coord}'
-                elif end_line_flag:
-                    result = re.match(r'(\D+)(\d+)', name)
-                    if edit == 'row' and result:
-                        pattern1, pattern2 = result.groups()
-                        pattern2 = int(pattern2) + 1
-                        new_name = pattern1 + str(pattern2)
-                    else:
-                        new_name = name
-                    
-                    if edit == 'row':
-                        if not(new_name == 'テストケースNoエリア' or new_name == 'ケースエリア' or new_name == '●付けエリア'):
-                            if mode == 'add':
-                                new_coord = f'{self.ws.title}!${get_column_letter(min_col)}${min_row + len(source)}:${get_column_letter(max_col)}${max_row + len(source)}'
-                            else:
-                                new_coord = f'{self.ws.title}!${get_column_letter(min_col)}${min_row - len(source)}:${get_column_letter(max_col)}${max_row - len(source)}'
-                            self.wb.defined_names.add(DefinedName(new_name, attr_text=new_coord))
-                        elif new_name == 'ケースエリア' or new_name == '●付けエリア':
-                            new_coord = f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row + len(source)}'
-                            self.wb.defined_names[new_name].attr_text = new_coord
-                    elif edit == 'col':
-                        if new_name in self.wb.defined_names:
-                            col_num = src_max_col - src_min_col + 1
-                            self.wb.defined_names[new_name].attr_txet = f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col + col_num)}${max_row}'
+            if edit == 'row' and not end_line_flag:
+                self.set_named_area(name, self.calc_rows_range(min_row, max_row, min_col, max_col, src_min_row, src_max_row, mode))
+            elif edit == 'col' and not end_line_flag:
+                self.set_named_area(name, self.calc_cols_range(min_row, max_row, min_col, max_col, src_min_row, src_max_row, mode))
+            elif end_line_flag:
+                if edit == 'row' and api_idx is not None:
+                    # 名前付き範囲の末尾の数字を1つ進める
+                    new_name = f'{kind}{api_idx + 2}'
+                else:
+                    new_name = name
+                
+                if edit == 'row':
+                    if not(new_name == 'テストケースNoエリア' or new_name == 'ケースエリア' or new_name == '●付けエリア'):
+                        if mode == 'add':
+                            self.set_named_area(new_name, (min_col, min_row + len(source), max_col, max_row + len(source)))
+                        else:
+                            self.set_named_area(new_name, (min_col, min_row - len(source), max_col, max_row - len(source)))
+                    elif new_name == 'ケースエリア' or new_name == '●付けエリア':
+                        self.set_named_area(new_name, (min_col, min_row, max_col, max_row + len(source)))
+                elif edit == 'col':
+                    if new_name in self.named_areas:
+                        col_num = src_max_col - src_min_col + 1
+                        self.set_named_area(new_name, (min_col, min_row, max_col + col_num, max_row))
 
     '''
     名前付き範囲の行の範囲を計算する関数
@@ -543,7 +662,8 @@ class DecisionExcelUtils:
     mode
         'add':行追加
         'minus':行削除
-
+    戻り値
+    (最小列, 最小行, 最大列, 最大行)
     '''
     def calc_rows_range(self, min_row, max_row, min_col, max_col, src_min_row, src_max_row, mode):
         row_num = src_max_row - src_min_row + 1
@@ -551,23 +671,23 @@ class DecisionExcelUtils:
             # 追加する行が名前付き範囲の範囲内の場合、
             # 名前付き範囲の最大行を追加する行数だけシフトさせる
             if mode =='add':
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row + row_num}'
+                return min_col, min_row, max_col, max_row + row_num
             elif mode == 'delete' and min_row <= (max_row - row_num):
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row - row_num}'
+                return min_col, min_row, max_col, max_row - row_num
             elif mode == 'delete' and min_row > (max_row - row_num):
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row}'
+                return min_col, min_row, max_col, max_row
         elif not(max_row < src_min_row and max_row < src_max_row):
             # 名前付き範囲と被っている場合、もしくは
             # 名前付き範囲の最小行：最小行 + 行数
             # 名前付き範囲の最大行；最大行 + 行数
             if mode == 'add':
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row + row_num}:${get_column_letter(max_col)}${max_row + row_num}'
+                return min_col, min_row + row_num, max_col, max_row + row_num
             elif mode == 'delete' and min_row <= (max_row - row_num):
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row - row_num}:${get_column_letter(max_col)}${max_row - row_num}'
+                return min_col, min_row - row_num, max_col, max_row - row_num
             elif mode == 'delete' and min_row > (max_row - row_num):
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row}'
+                return min_col, min_row, max_col, max_row
     
-        return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row}'
+        return min_col, min_row, max_col, max_row
 
     '''
     名前付き範囲の列の範囲を計算する関数
@@ -582,7 +702,8 @@ class DecisionExcelUtils:
     mode
         'add':行追加
         'minus':行削除
-
+    戻り値
+    (最小列, 最小行, 最大列, 最大行)
     '''
     
     def calc_cols_range(self, min_row, max_row, min_col, max_col, src_min_col, src_max_col, mode):
@@ -591,20 +712,174 @@ class DecisionExcelUtils:
             # 追加する列が名前付き範囲の範囲内の場合、
             # 名前付き範囲の最大列を追加する列数だけシフトさせる
             if mode == 'add':
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col + col_num)}${max_row}'
+                return min_col, min_row, max_col + col_num, max_row
             else:
-                return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col - col_num)}${max_row}'
+                return min_col, min_row, max_col - col_num, max_row
         else:
             # 名前付き範囲と被っている場合、
             # 名前付き範囲の最小列：最小列 + 列数
             # 名前付き範囲の最大列：最大列 + 列数
             if mode == 'add':
-                return f'{self.ws.title}!${get_column_letter(min_col + col_num)}${min_row}:${get_column_letter(max_col + col_num)}${max_row}'
+                return min_col + col_num, min_row, max_col + col_num, max_row
             else:
-                return f'{self.ws.title}!${get_column_letter(min_col - col_num)}${min_row}:${get_column_letter(max_col - col_num)}${max_row}'
+                return min_col - col_num, min_row, max_col - col_num, max_row
             
-        return f'{self.ws.title}!${get_column_letter(min_col)}${min_row}:${get_column_letter(max_col)}${max_row}'
+        return min_col, min_row, max_col, max_row
+
+
+    '''
+    行・列の追加・削除後のセル範囲の境界を計算する関数
+    bounds
+    (最小列, 最小行, 最大列, 最大行)
+    edit
+        col:列に対して操作を行う場合
+        row:行に対して操作を行う場合
+    start
+    追加・削除する位置
+    amount
+    追加する行数・列数（負の値の場合は削除する行数・列数）
+    end_line_flag
+        True:範囲の末尾に対して追加を行う場合（直前で終わる範囲も広げる）
+        False:途中に追加する場合
+    戻り値
+    更新後の境界、範囲がすべて削除される場合はNone
+    '''
+    def calc_shift_bounds(self, bounds, edit, start, amount, end_line_flag=False):
+        min_col, min_row, max_col, max_row = bounds
+        if edit == 'row':
+            low, high = min_row, max_row
+        else:
+            low, high = min_col, max_col
 
+        if amount > 0:
+            if start <= low:
+                # 追加する位置が範囲より上（左）の場合、範囲全体をずらす
+                low += amount
+                high += amount
+            elif start <= high or (end_line_flag and start == high + 1):
+                # 追加する位置が範囲内（末尾に追加する場合は範囲の直後）の場合、範囲を広げる
+                high += amount
+        else:
+            end = start - amount - 1
+            if end < low:
+                # 削除する位置が範囲より上（左）の場合、範囲全体をずらす
+                low += amount
+                high += amount
+            elif start <= high:
+                # 削除する位置が範囲と重なる場合、重なった分だけ範囲を狭める
+                overlap = min(high, end) - max(low, start) + 1
+                if overlap >= high - low + 1:
+                    return None
+                low = min(low, start)
+                high -= overlap
+
+        # シートの最大行・最大列を超えないようにする
+        if edit == 'row':
+            return min_col, low, max_col, min(high, const.SHEET_MAX_ROW)
+        return low, min_row, min(high, const.SHEET_MAX_COL), max_row
+
+    '''
+    行・列の追加・削除に合わせて入力規則の範囲をずらす関数
+    edit
+        col:列に対して操作を行う場合
+        row:行に対して操作を行う場合
+    start
+    追加・削除する位置
+    amount
+    追加する行数・列数（負の値の場合は削除する行数・列数）
+    end_line_flag
+        True:範囲の末尾に対して追加を行う場合（直前で終わる範囲も広げる）
+        False:途中に追加する場合
+    '''
+    def shift_data_validations(self, edit, start, amount, end_line_flag=False):
+        for dv in self.ws.data_validations.dataValidation:
+            new_ranges = []
+            for ref in dv.sqref.ranges:
+                bounds = self.calc_shift_bounds(ref.bounds, edit, start, amount, end_line_flag)
+                if bounds is not None:
+                    new_ranges.append(CellRange(min_col=bounds[0], min_row=bounds[1], max_col=bounds[2], max_row=bounds[3]))
+            dv.sqref = MultiCellRange(new_ranges)
+
+    '''
+    行・列の追加・削除に合わせて条件付き書式の範囲をずらす関数
+    edit
+        col:列に対して操作を行う場合
+        row:行に対して操作を行う場合
+    start
+    追加・削除する位置
+    amount
+    追加する行数・列数（負の値の場合は削除する行数・列数）
+    end_line_flag
+        True:範囲の末尾に対して追加を行う場合（直前で終わる範囲も広げる）
+        False:途中に追加する場合
+    '''
+    def shift_conditional_formats(self, edit, start, amount, end_line_flag=False):
+        formats = ConditionalFormattingList()
+        for cf in self.ws.conditional_formatting:
+            new_ranges = []
+            for ref in cf.sqref.ranges:
+                bounds = self.calc_shift_bounds(ref.bounds, edit, start, amount, end_line_flag)
+                if bounds is not None:
+                    new_ranges.append(CellRange(min_col=bounds[0], min_row=bounds[1], max_col=bounds[2], max_row=bounds[3]))
+            if len(new_ranges) == 0:
+                continue
+            new_cf = ConditionalFormatting(sqref=MultiCellRange(new_ranges), pivot=cf.pivot)
+            for rule in cf.rules:
+                formats.add(new_cf, rule)
+        # 優先順位を引き継ぐ
+        formats.max_priority = self.ws.conditional_formatting.max_priority
+        self.ws.conditional_formatting = formats
+
+    '''
+    行・列の追加・削除に合わせて名前付き範囲をずらす関数
+    edit
+        col:列に対して操作を行う場合
+        row:行に対して操作を行う場合
+    start
+    追加・削除する位置
+    amount
+    追加する行数・列数（負の値の場合は削除する行数・列数）
+    end_line_flag
+        True:範囲の末尾に対して追加を行う場合（直前で終わる範囲も広げる）
+        False:途中に追加する場合
+    '''
+    def shift_named_ranges(self, edit, start, amount, end_line_flag=False):
+        for name, (kind, api_idx, bounds) in list(self.named_areas.items()):
+            min_col, min_row, max_col, max_row = bounds
+            bounds = self.calc_shift_bounds(bounds, edit, start, amount, end_line_flag)
+            if bounds is None:
+                # 範囲がすべて削除される場合は削除した位置の1行（1列）を残す
+                if edit == 'row':
+                    bounds = (min_col, start, max_col, start)
+                else:
+                    bounds = (start, min_row, start, max_row)
+            self.set_named_area(name, bounds)
+
+    '''
+    行の追加・削除に合わせて行の高さをずらす関数
+    高さが設定されている行のみを対象に、1回の走査で移動させる
+    start_row
+    追加・削除する位置
+    amount
+    追加した行数（負の値の場合は削除した行数）
+    '''
+    def shift_row_heights(self, start_row, amount):
+        # 追加・削除する位置以降で高さが設定されている行の高さを保持
+        row_heights = {}
+        for row, dimension in self.ws.row_dimensions.items():
+            if row >= start_row and dimension.height is not None:
+                row_heights[row] = dimension.height
+
+        # 元の位置の高さを初期化
+        for row in row_heights:
+            self.ws.row_dimensions[row].height = None
+
+        # ずれた位置に高さを再設定
+        for row, height in row_heights.items():
+            if amount < 0 and row < start_row - amount:
+                # 削除された行の高さは設定しない
+                continue
+            self.ws.row_dimensions[row + amount].height = height
 
     '''
     行を追加するための関数
@@ -619,42 +894,87 @@ class DecisionExcelUtils:
     
     def add_rows(self, source, start_row, end_line_flag):
         # 行を挿入
-        self.ws.insert_rows(start_row, amount=len(source))
+        self.insert_sheet_rows(start_row, len(source))
 
         if not end_line_flag:
             # 行追加によりデータ入力規則の範囲がずれるため、範囲の更新を行う
             self.translate_data_validations(source, 'row', 'add')
             
-            # 元の行の高さを保持
-            row_heights = {}
-            for row in range(start_row, self.ws.max_row + len(source)):
-                row_heights[row] = self.ws.row_dimensions[row].height
-
-                # 挿入してずれた行の高さを再設定
-                for row, height in row_heights.items():
-                    self.ws.row_dimensions[row + len(source)].height = height
+            # 挿入してずれた行の高さを再設定
+            self.shift_row_heights(start_row, len(source))
         else:
 
             # 末尾に行を追加するため、コピー元に入力規則がある場合に入力規則をコピー
             self.add_data_validations(source, 'row')
 
-        # 挿入した行に対してコピー元に入力規則がある場合に入力規則をコピー
-        for row_idx, row in enumerate(source, start=start_row):
-            # コピー元の高さを取得
-            source_height = self.ws.row_dimensions[row[0].row].height
-            # コピー先の高さを設定
-            self.ws.row_dimensions[row_idx].height = source_height
-            for col_idx, cell in enumerate(row, start=1):
-                target = self.ws.cell(row=row_idx, column=col_idx)
-                # コピー元の値を設定
-                if not self.exists_flag:
-                    target.value = cell.value
-                # コピー元のスタイルを設定
-                target._style = copy(cell._style)
+        # 挿入した行に対してコピー元の高さ・値・スタイルを設定
+        self.replicate_rows(source, start_row, 1)
 
         # 名前付き範囲の更新
         self.edit_named_range(source, end_line_flag, 'row', 'add')
     
+    '''
+    コピー元の行を指定した回数分、一括で追加するための関数
+    行の挿入、入力規則・条件付き書式・行の高さ・名前付き範囲の更新を1回で行う
+    source
+    コピー元のオブジェクト
+    start_row
+    行追加する位置
+    amount
+    コピー元の行を追加する回数
+    '''
+    def add_rows_bulk(self, source, start_row, amount):
+        if amount <= 0:
+            return
+
+        # 追加する行数
+        total = len(source) * amount
+
+        # 行を挿入
+        self.insert_sheet_rows(start_row, total)
+
+        # 行追加により範囲がずれるため、入力規則と条件付き書式の範囲を更新
+        self.shift_data_validations('row', start_row, total)
+        self.shift_conditional_formats('row', start_row, total)
+
+        # 挿入してずれた行の高さを再設定
+        self.shift_row_heights(start_row, total)
+
+        if self.direct_flag:
+            # ダイレクト出力モードではセルを作成せず、コピー元の高さ・値・スタイルを共有する行として保持する
+            self.virtual_rows.append(VirtualRows.from_source(self.ws, source, start_row, amount, not self.exists_flag))
+            amount = 0
+
+        # 挿入した行に対してコピー元の高さ・値・スタイルを設定
+        self.replicate_rows(source, start_row, amount)
+
+        # 名前付き範囲の更新
+        self.shift_named_ranges('row', start_row, total)
+
+    '''
+    指定した行数を一括で削除するための関数
+    start_row
+    行削除する位置
+    amount
+    削除する行数
+    '''
+    def delete_rows_bulk(self, start_row, amount):
+        if amount <= 0:
+            return
+
+        # 行を削除
+        self.delete_sheet_rows(start_row, amount)
+
+        # 行削除により範囲がずれるため、入力規則と条件付き書式の範囲を更新
+        self.shift_data_validations('row', start_row, -amount)
+        self.shift_conditional_formats('row', start_row, -amount)
+
+        # 削除してずれた行の高さを再設定
+        self.shift_row_heights(start_row, -amount)
+
+        # 名前付き範囲の更新
+        self.shift_named_ranges('row', start_row, -amount)
+
     '''
     行を削除するための関数
     source
@@ -667,14 +987,25 @@ class DecisionExcelUtils:
     '''
     def delete_rows(self, source, start_row):
         # 行を追加
-        self.ws.delete_rows(start_row, len(source))
+        self.delete_sheet_rows(start_row, len(source))
 
         # 行追加によりデータ入力規則の範囲がずれるため、範囲の更新を行う
         self.translate_data_validations(source, 'row', 'delete')
 
+        # 削除してずれた行の高さを再設定
+        self.shift_row_heights(start_row, -len(source))
+
         # 名前付き範囲の更新
         self.edit_named_range(source, False, 'row','delete')
     
+    '''
+    ダイレクト出力モードで追加した行がある状態で列を追加していないかチェックする関数
+    追加した行はコピー元の列ごとのスタイルを保持しているため、列は行より先に追加する
+    '''
+    def check_virtual_rows_for_cols(self):
+        if self.virtual_rows:
+            raise Exception('ダイレクト出力モードでは、パラメータの行を追加した後に列を追加できません')
+
     '''
     列を追加するための関数
     source
@@ -686,6 +1017,7 @@ class DecisionExcelUtils:
         False:途中に追加する場合
     '''
     def add_cols(self, source, start_col, end_line_flag):
+        self.check_virtual_rows_for_cols()
 
         min_col = source[0][0].column
         max_col = source[0][len(source[0]) - 1].column
@@ -708,18 +1040,111 @@ class DecisionExcelUtils:
             self.ws.column_dimensions[get_column_letter(col_idx)].width = 8.5
         
         # 挿入した行に対してコピー元のデータとスタイルを設定
-        for copy_cells in source:
-            for cell in copy_cells:
-                target = self.ws.cell(row=cell.row, column=cell.column + add_col_num)
-                # コピー元の値を設定
-                if not self.exists_flag:
-                    target.value = cell.value
-                # コピー元のスタイルを設定
-                target._style = copy(cell._style)
+        self.replicate_cols(source, [add_col_num])
         
         # 名前付き範囲の更新
         self.edit_named_range(source, end_line_flag, 'col', 'add')
     
+    '''
+    コピー元の列を指定した回数分、一括で末尾に追加するための関数
+    列の挿入、入力規則・条件付き書式・名前付き範囲の更新を1回で行う
+    source
+    コピー元オブジェクト
+    start_col
+    列追加する位置
+    amount
+    コピー元の列を追加する回数
+    '''
+    def add_cols_bulk(self, source, start_col, amount):
+        if amount <= 0:
+            return
+        self.check_virtual_rows_for_cols()
+
+        min_col = source[0][0].column
+        max_col = source[0][len(source[0]) - 1].column
+
+        # 追加する列数
+        src_col_num = max_col - min_col + 1
+        total = src_col_num * amount
+
+        # 列を挿入
+        self.ws.insert_cols(start_col, amount=total)
+
+        # 列追加により範囲がずれるため、入力規則と条件付き書式の範囲を更新
+        self.shift_data_validations('col', start_col, total, True)
+        self.shift_conditional_formats('col', start_col, total, True)
+
+        for col_idx in range(start_col, start_col + total):
+            # コピー先の幅を設定
+            self.ws.column_dimensions[get_column_letter(col_idx)].width = 8.5
+
+        # 挿入した列に対してコピー元のデータとスタイルを設定
+        self.replicate_cols(source, [start_col - min_col + i * src_col_num for i in range(0, amount)])
+
+        # 名前付き範囲の更新
+        self.shift_named_ranges('col', start_col, total, True)
+
+    '''
+    コピー元の行単位のセルから、列ごとの値とスタイルを取得する関数
+    スタイルはコピー元のセルのスタイルの配列をそのまま参照する(複製はコピー先のセルごとにput_cellで行う)
+    source
+    コピー元の行単位のセル
+    戻り値
+    行ごとの[(コピー元のセル, 値, スタイル)]
+    '''
+    def get_style_vectors(self, source):
+        return [[(cell, cell.value, cell._style if cell.has_style else None) for cell in row] for row in source]
+
+    '''
+    コピー先のセルに値とスタイルを設定する関数
+    シート上にセルがない場合は、セルを作成して追加する
+    '''
+    def put_cell(self, row_idx, col_idx, value, style):
+        target = self.ws._cells.get((row_idx, col_idx))
+        if target is None:
+            target = Cell(self.ws, row=row_idx, column=col_idx)
+            self.ws._add_cell(target)
+        # コピー元の値を設定
+        if not self.exists_flag:
+            target.value = value
+        # コピー元のスタイルを設定
+        # スタイルの設定はセルのスタイルの配列を直接変更するため、配列はセルごとに複製する(スタイルのIDは共有する)
+        # スタイルのないセルは配列を作成しない(スタイルを設定する際にopenpyxlが作成する)
+        target._style = copy(style) if style is not None else None
+
+    '''
+    コピー元の行の高さ・値・スタイルを、指定した回数分追加した行に設定する関数
+    source
+    コピー元の行単位のセル
+    start_row
+    追加した最初の行
+    amount
+    コピー元の行を追加した回数
+    '''
+    def replicate_rows(self, source, start_row, amount):
+        vectors = self.get_style_vectors(source)
+        # コピー元の行ごとの高さ
+        heights = [self.ws.row_dimensions[row[0].row].height for row in source]
+        for i in range(0, amount):
+            for row_idx, vector, height in zip(range(start_row + i * len(source), start_row + (i + 1) * len(source)), vectors, heights):
+                # コピー先の高さを設定
+                self.ws.row_dimensions[row_idx].height = height
+                for col_idx, (cell, value, style) in enumerate(vector, start=1):
+                    self.put_cell(row_idx, col_idx, value, style)
+
+    '''
+    コピー元の列の値・スタイルを、追加した列に設定する関数
+    source
+    コピー元の行単位のセル
+    offsets
+    コピー元の列からコピー先の列までの列数のリスト(追加した回数分)
+    '''
+    def replicate_cols(self, source, offsets):
+        for vector in self.get_style_vectors(source):
+            for cell, value, style in vector:
+                for offset in offsets:
+                    self.put_cell(cell.row, cell.column + offset, value, style)
+
     '''
     ケースNoとスクリプトNoを入力する関数
     case_num
@@ -760,14 +1185,9 @@ class DecisionExcelUtils:
     ケース数のチェック
     '''
     def check_case_count(self, case_num):
-        for name, defined_name in self.wb.defined_names.items():
-            if const.AREA_NAME_CASEAREA not in defined_name.name:
-                # target_area_nameの行以外はスキップ
-                continue
-
+        for name in self.get_named_area_names(const.AREA_NAME_CASEAREA):
             # 最小行と最大行を取得
-            named_range = self.wb.defined_names[defined_name.name]
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(named_range.destinations)
+            min_col, min_row, max_col, max_row = self.named_areas[name][2]
 
             count = max_col - min_col +1
             if case_num <= count:
@@ -776,41 +1196,46 @@ class DecisionExcelUtils:
     
     '''
     リクエストパラメータの取得
+    名前付き範囲ごとにkey列〜ケース列を一度だけ値として読み込み、
+    ●付けの有無はケース×行の行列でまとめて判定する
     '''
     def get_param_list(self, case_num, api_num, param_list, target_name):
-        for name, defined_name in self.wb.defined_names.items():
-            if target_name not in defined_name.name:
-                # target_area_nameの行以外はスキップ
-                continue
+        if case_num <= 0:
+            return param_list
 
-            # 名前付き範囲を名前と末尾の数字に分割
-            result = re.match(r'(\D+)(\d+)', name)
-            if result:
-                pattern1, pattern2 = result.groups()
-                api_idx = int(pattern2) -1 # 何回目に呼び出されるAPIを判別するための番号
+        for name in self.get_named_area_names(target_name):
+            # api_idx:何回目に呼び出されるAPIを判別するための番号
+            kind, api_idx, bounds = self.named_areas[name]
             
             # 最小行と最大行を取得
-            named_range = self.wb.defined_names[name]
-            min_col, min_row, max_col, max_row = self.get_min_to_max_coord(named_range.destinations)
+            min_col, min_row, max_col, max_row = bounds
+            # key列からケース数分の●付け列までを値のみで一括取得
+            block = np.array(list(self.ws.iter_rows(min_row=min_row, max_row=max_row,
+                                                    min_col=const.INPUT_KEY_COL,
+                                                    max_col=const.INPUT_AREA_COL + case_num - 1,
+                                                    values_only=True)), dtype=object)
+            if block.size == 0:
+                block = np.empty((0, const.INPUT_AREA_COL + case_num - const.INPUT_KEY_COL), dtype=object)
+            # 読み込み開始列をkey列とした相対位置
+            keys = block[:, 0]
+            values = block[:, const.INPUT_VALUE_COL - const.INPUT_KEY_COL]
+            # ケース×行の●付けマスク
+            marks = (block[:, const.INPUT_AREA_COL - const.INPUT_KEY_COL:] == '●').T
+
             # ケース数分、ループ処理
             for i in range(0, case_num):
-                data : Dict[str, Set[int]] = {}
-                # api_idx何回目のリクエストパラメータ数分、ループ処理
-                for row in range(min_row, max_row +1):
-                    # keyの取得
-                    key = self.ws.cell(row=row, column=const.INPUT_KEY_COL).value
-                    # valueの取得
-                    value = self.ws.cell(row=row, column=const.INPUT_VALUE_COL).value
-                    
-                    if '●' == self.ws.cell(row=row, column=const.INPUT_AREA_COL + i).value:
-                        if target_name == const.AREA_NAME_REQUEST:
-                            if key not in data:
-                                data[key] = set()
-                            data[key].add(value)
-                        else:
-                            if key not in data:
-                                data[key]=''
-                            data[key] = value
+                data : Dict[str, Dict[object, None]] = {}
+                # ●が付いている行のみ処理
+                for row_idx in np.flatnonzero(marks[i]):
+                    key = keys[row_idx]
+                    value = values[row_idx]
+                    if target_name == const.AREA_NAME_REQUEST:
+                        # 値はシートの行の順番を保ったまま重複を除く
+                        if key not in data:
+                            data[key] = {}
+                        data[key][value] = None
+                    else:
+                        data[key] = value
                             
                 # リクエストパラメータリストに値を追加
                 param_list[i][api_idx] = data
@@ -822,18 +1247,24 @@ class DecisionExcelUtils:
     '''
     def clear_decision_area(self, target_list):
         for target in target_list:
-            for name, deifined_name in self.wb.defined_names.items():
-                if target not in deifined_name.name:
-                    # target_area_nameの行以外はスキップ
-                    continue
+            for name in self.get_named_area_names(target):
                 # 最小行と最大行を取得
-                named_range = self.wb.defined_names[deifined_name.name]
-                cells = named_range.destinations
+                min_col, min_row, max_col, max_row = self.named_areas[name][2]
 
-                for title, coord in cells:
-                    for row in self.ws[coord]:
-                        for cell in row:
-                            cell.value = None
+                # ダイレクト出力モードで追加した行はセルを作成せずに値を空にする
+                virtual_row_set = set()
+                for rows in self.virtual_rows:
+                    first = max(min_row, rows.start_row)
+                    last = min(max_row, rows.end_row)
+                    if first <= last:
+                        rows.clear(first - rows.start_row, last - rows.start_row, min_col, max_col)
+                        virtual_row_set.update(range(first, last + 1))
+
+                for row in range(min_row, max_row + 1):
+                    if row in virtual_row_set:
+                        continue
+                    for cell in next(self.ws.iter_rows(min_row=row, max_row=row, min_col=min_col, max_col=max_col)):
+                        cell.value = None
     
     '''
     エクセルを保存する関数
@@ -841,7 +1272,13 @@ class DecisionExcelUtils:
     フルパス
     '''
     def save_book(self, path):
-        self.wb.save(path)
+        # 名前付き範囲の更新をブックに反映
+        self.write_named_areas()
+        if self.direct_flag:
+            # 追加した行は保存時に1行ずつ書き込む
+            DirectSheetWriter.save(self.wb, self.ws, self.virtual_rows, path)
+        else:
+            self.wb.save(path)
 
 
 
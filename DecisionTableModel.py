@@ -0,0 +1,363 @@
+import numpy as np
+import pandas as pd
+
+class DecisionTableModel:
+    '''
+    ディシジョンテーブルの共通のデータモデル
+    作成(入力ファイル⇒エクセル)と出力(エクセル⇒JSON・properties)の両方で使用する
+    key・valueは重複を除いて一度だけ保持し、各行はその番号のみを保持する
+    ●付けはケースごとに●が付いている行番号のみを保持する(CSR形式の疎行列)
+    '''
+    # 種類
+    REQUEST = 'request'
+    RESPONSE = 'response'
+
+    def __init__(self, case_num):
+        self.case_num = case_num
+        # key・valueの実体(番号⇒値)
+        self.pool = []
+        # (型, 値):番号
+        self.pool_index = {}
+        # 各行のkey・valueの番号
+        self.row_keys = []
+        self.row_values = []
+        # 各行のシート上の行のインデックス(エクセルから読み込んだ場合のみ)
+        self.row_lines = []
+        # (種類, 何回目のAPIか):(開始行, 終了行(この行は含まない))
+        self.sections = {}
+        # ケースごとの●付け、ケースiの行番号はindices[indptr[i]:indptr[i + 1]](昇順)
+        self.indptr = np.zeros(case_num + 1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int32)
+        # ケースの列名と最初のケースの列のインデックス
+        self.case_columns = list(range(case_num))
+        self.start_col = 0
+        # ヘッダー行(「テストケース」の次の行)が見つかったか、ヘッダーが空のケース
+        self.header_found = True
+        self.missing_headers = np.zeros(case_num, dtype=bool)
+        # 組み立て中の●付け(ケース, 行番号)
+        self.mark_cases = []
+        self.mark_rows = []
+
+    '''
+    key・valueを登録し、番号を取得する関数
+    同じ型・同じ値は同じ番号になる(1と1.0とTrueは別の値として扱う)
+    value
+    登録する値(NaNはNoneとして登録する)
+    '''
+    def intern(self, value):
+        if isinstance(value, float) and value != value:
+            value = None
+        pool_key = (value.__class__, value)
+        value_id = self.pool_index.get(pool_key)
+        if value_id is None:
+            value_id = len(self.pool)
+            self.pool.append(value)
+            self.pool_index[pool_key] = value_id
+        return value_id
+
+    '''
+    行を追加する関数
+    key
+    key名
+    value
+    値
+    line
+    シート上の行のインデックス(省略時は-1)
+    戻り値
+    追加した行の番号
+    '''
+    def add_row(self, key, value, line=-1):
+        self.row_keys.append(self.intern(key))
+        self.row_values.append(self.intern(value))
+        self.row_lines.append(line)
+        return len(self.row_keys) - 1
+
+    '''
+    ●付けを追加する関数
+    finishを呼び出すまでは検索に反映されない
+    case_idx
+    ケースのインデックス
+    row
+    行番号
+    '''
+    def mark(self, case_idx, row):
+        self.mark_cases.append(case_idx)
+        self.mark_rows.append(row)
+
+    '''
+    組み立てを完了する関数
+    行の情報を配列に変換し、●付けをケースごとの行番号(CSR形式)にまとめる
+    '''
+    def finish(self):
+        self.row_keys = np.asarray(self.row_keys, dtype=np.int32)
+        self.row_values = np.asarray(self.row_values, dtype=np.int32)
+        self.row_lines = np.asarray(self.row_lines, dtype=np.int32)
+        self.set_marks(np.asarray(self.mark_cases, dtype=np.int64), np.asarray(self.mark_rows, dtype=np.int64))
+        self.mark_cases = []
+        self.mark_rows = []
+        return self
+
+    '''
+    ●付けをケースごとの行番号(CSR形式)に変換して設定する関数
+    同じケース・同じ行の●付けは1つにまとめる
+    cases
+    ケースのインデックスの配列
+    rows
+    行番号の配列
+    '''
+    def set_marks(self, cases, rows):
+        row_num = max(len(self.row_keys), 1)
+        # ケース・行番号の順に並べて重複を除く
+        pairs = np.unique(cases * row_num + rows)
+        cases, rows = np.divmod(pairs, row_num)
+        self.indices = rows.astype(np.int32)
+        self.indptr = np.zeros(self.case_num + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cases, minlength=self.case_num)[:self.case_num], out=self.indptr[1:])
+
+    '''
+    セクションの範囲を取得する関数
+    kind
+    'request'または'response'
+    api_idx
+    何回目のAPIか(エクセルから読み込んだ場合は何番目のCondition・Expected resultか)
+    戻り値
+    (開始行, 終了行(この行は含まない))、セクションがない場合は(0, 0)
+    '''
+    def section(self, kind, api_idx):
+        return self.sections.get((kind, api_idx), (0, 0))
+
+    '''
+    セクションの行数を取得する関数
+    skip_key
+    指定した場合、key名がこの値の行は数えない
+    '''
+    def row_count(self, kind, api_idx, skip_key=None):
+        start, end = self.section(kind, api_idx)
+        if skip_key is None:
+            return end - start
+        skip_id = self.pool_index.get((skip_key.__class__, skip_key))
+        return int(np.count_nonzero(self.row_keys[start:end] != skip_id)) if skip_id is not None else end - start
+
+    '''
+    セクションのkey名と値の一覧を取得する関数
+    戻り値
+    (key名のリスト, 値のリスト)
+    '''
+    def section_params(self, kind, api_idx):
+        start, end = self.section(kind, api_idx)
+        return ([self.pool[key_id] for key_id in self.row_keys[start:end]],
+                [self.pool[value_id] for value_id in self.row_values[start:end]])
+
+    '''
+    ケースで●が付いている行番号を取得する関数
+    kind・api_idxを指定した場合はそのセクションの行のみ取得する
+    戻り値
+    行番号の配列(昇順)
+    '''
+    def case_rows(self, case_idx, kind=None, api_idx=None):
+        rows = self.indices[self.indptr[case_idx]:self.indptr[case_idx + 1]]
+        if kind is None:
+            return rows
+        start, end = self.section(kind, api_idx)
+        return rows[np.searchsorted(rows, start):np.searchsorted(rows, end)]
+
+    '''
+    行のkey名と値を取得する関数
+    戻り値
+    (key名, 値)
+    '''
+    def row(self, row):
+        return self.pool[self.row_keys[row]], self.pool[self.row_values[row]]
+
+    '''
+    ケースごとにセクションの●が付いている行へ関数を適用する関数
+    ディシジョンテーブルからJSON・propertiesのオブジェクトを作成する際に使用する
+    kind
+    'request'または'response'
+    api_idx
+    何番目のCondition・Expected resultか
+    process_row_func
+    ●が付いている各行に適用する関数(結果の辞書, key名, 値)、エラーメッセージを返す
+    check_value
+    ●付けの値(ログメッセージに使用)
+    戻り値
+    (列名:結果の辞書, ログメッセージのリスト, エラーメッセージのリスト)
+    '''
+    def process_section(self, kind, api_idx, process_row_func, check_value='●'):
+        results = {}
+        log_messages = []
+        errMsgList = []
+        if not self.header_found:
+            log_messages.append("The row 'テストケース' could not be found.")
+            return results, log_messages, errMsgList
+
+        for case_idx, column in enumerate(self.case_columns):
+            # ヘッダー行が欠けているかどうかを確認
+            if self.missing_headers[case_idx]:
+                log_messages.append(f"Column header is missing for column index {self.start_col + case_idx}. Skipping this column.")
+                continue
+            rows = self.case_rows(case_idx, kind, api_idx)
+            if rows.size == 0:
+                log_messages.append(f"No '{check_value}' found in the test case column '{column}'. Skipping this column.")
+                continue
+            result = {}
+            for row in rows:
+                key, value = self.row(row)
+                errMsg = process_row_func(result, key, value)
+                if errMsg != None and errMsg != "":
+                    errMsgList.append(str(errMsg) + "Line " + str(self.row_lines[row] + 1))
+
+            if "" in result:
+                results[column] = result[""]
+            else:
+                results[column] = result
+        return results, log_messages, errMsgList
+
+    '''
+    ディシジョンテーブルのシートを読み込んだDataFrameからモデルを作成する関数
+    「リクエストパラメータ」の次の行から「Condition」の最後の行までをrequest、
+    「レスポンスパラメータ」の次の行から「Expected result」の最後の行までをresponseのセクションとする
+    df
+    シートを読み込んだDataFrame
+    sections
+    dfのindex_sectionsの戻り値
+    start_col
+    最初のケースの列のインデックス
+    check_value
+    ●付けの値
+    '''
+    @staticmethod
+    def from_sheet(df, sections, start_col=5, check_value='●'):
+        model = DecisionTableModel(max(len(df.columns) - start_col, 0))
+        model.case_columns = list(df.columns[start_col:])
+        model.start_col = start_col
+        if sections['test_case_rows']:
+            # テストケースが結合セルのため、次の行がヘッダー行
+            header_row = df.iloc[sections['test_case_rows'][0] + 1, start_col:].to_numpy(dtype=object)
+            model.missing_headers = np.asarray(pd.isna(header_row), dtype=bool)
+        else:
+            model.header_found = False
+
+        ranges = []
+        for i, param_row in enumerate(sections['request_param_rows']):
+            ranges.append((DecisionTableModel.REQUEST, i, param_row + 1, sections['condition_last_rows'][i] + 1))
+        for i, param_row in enumerate(sections['response_param_rows']):
+            ranges.append((DecisionTableModel.RESPONSE, i, param_row + 1, sections['expected_result_last_rows'][i] + 1))
+
+        keys = df.iloc[:, 3].to_numpy(dtype=object)  # キーは4列目
+        values = df.iloc[:, 5].to_numpy(dtype=object)  # 値は6列目
+        lines = []
+        for kind, api_idx, start, end in ranges:
+            section_start = len(model.row_keys)
+            for line in range(start, min(end, len(df))):
+                model.add_row(keys[line], values[line], line)
+                lines.append(line)
+            model.sections[(kind, api_idx)] = (section_start, len(model.row_keys))
+        model.finish()
+
+        # ●付けは対象の行のみをまとめて判定する
+        if lines and model.case_num > 0:
+            marks = df.iloc[lines, start_col:].to_numpy(dtype=object) == check_value
+            rows, cases = np.nonzero(marks)
+            model.set_marks(cases, rows)
+        return model
+
+    '''
+    入力ファイルから読み込んだパラメータからモデルを作成する関数
+    リクエストはAPIごとにParamCatalogでkey名・値の組み合わせを集計して1行とし、同じ組み合わせを持つケースに●を付ける
+    レスポンスはケースごとにkey名・値を1行とし、そのケースに●を付ける
+    request_data
+    [ケース][何回目のAPIか]のkey名:値の一覧
+    response_data
+    [ケース][何回目のAPIか]のkey名:値
+    case_num
+    ケース数
+    api_num
+    APIの呼び出し回数
+    '''
+    @staticmethod
+    def from_folder_data(request_data, response_data, case_num, api_num):
+        model = DecisionTableModel(case_num)
+        for api_idx in range(api_num):
+            # ケースの順番にkey名・値の組み合わせを集計
+            catalog = ParamCatalog()
+            for case_object in request_data:
+                api_object = case_object[api_idx]
+                if api_object is None or len(api_object) == 0:
+                    continue
+                for key, values in api_object.items():
+                    for value in values:
+                        catalog.add(key, value)
+
+            start = len(model.row_keys)
+            for key, value in catalog.params():
+                model.add_row(key, value)
+            model.sections[(DecisionTableModel.REQUEST, api_idx)] = (start, len(model.row_keys))
+
+            for case_idx, case_object in enumerate(request_data):
+                api_object = case_object[api_idx]
+                if api_object is None:
+                    continue
+                for key, values in api_object.items():
+                    for value in values:
+                        model.mark(case_idx, start + catalog.find(key, value))
+
+            start = len(model.row_keys)
+            for case_idx, case_object in enumerate(response_data):
+                api_object = case_object[api_idx]
+                if api_object is None or len(api_object) == 0:
+                    continue
+                for key, value in api_object.items():
+                    model.mark(case_idx, model.add_row(key, value))
+            model.sections[(DecisionTableModel.RESPONSE, api_idx)] = (start, len(model.row_keys))
+        return model.finish()
+
+
+class ParamCatalog:
+    '''
+    API1回分のリクエストパラメータの一覧
+    key名・値の組み合わせを最初に登録された順番で重複なく保持する
+    key名ごとに値:番号の辞書を持つため、登録・検索は値の数によらず一定の時間で行える
+    並び順はkey名の最初の登録順、同じkey名の中では値の最初の登録順
+    '''
+    def __init__(self):
+        # key名:{値:key名の中での順番}
+        self.catalog = {}
+        # 組み合わせの数
+        self.size = 0
+        # (key名, 値):並び順での番号(paramsの呼び出し後に作成)
+        self.positions = None
+
+    '''
+    key名・値の組み合わせを登録する関数
+    既に登録されている組み合わせは無視する
+    '''
+    def add(self, key, value):
+        values = self.catalog.get(key)
+        if values is None:
+            values = self.catalog[key] = {}
+        if value not in values:
+            values[value] = len(values)
+            self.size += 1
+            self.positions = None
+
+    '''
+    登録されている組み合わせを並び順で取得する関数
+    戻り値
+    (key名, 値)のリスト
+    '''
+    def params(self):
+        return [(key, value) for key, values in self.catalog.items() for value in values]
+
+    '''
+    key名・値の組み合わせの並び順での番号を取得する関数
+    戻り値
+    番号(登録されていない場合はNone)
+    '''
+    def find(self, key, value):
+        if self.positions is None:
+            self.positions = {param: position for position, param in enumerate(self.params())}
+        return self.positions.get((key, value))
+
+    def __len__(self):
+        return self.size
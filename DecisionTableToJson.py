@@ -1,4 +1,7 @@
 import pandas as pd
+import numpy as np
+import openpyxl
+from openpyxl.cell.cell import ERROR_CODES
 import os
 import json
 import logging
@@ -6,14 +9,23 @@ from pathlib import Path
 import configparser
 import re
 from collections import defaultdict
+from functools import lru_cache
 import warnings
 import traceback
 from distutils.util import strtobool
 import ctypes
 import shutil
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from DecisionTableModel import DecisionTableModel
 
 # ロギング設定
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', filemode='w', filename='execute.log')
+# 並列処理の子プロセスではログファイルを上書きしない
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                    filemode='w' if multiprocessing.parent_process() is None else 'a', filename='execute.log')
 logger = logging.getLogger()
 warnings.simplefilter(action='ignore', category=UserWarning)
 
@@ -22,6 +34,109 @@ def outputMsgBox(msg, title):
     msgBox = ctypes.winDLL.user32.MessageBoxW
     msgBox(0, msg, title, 0x00000000|0x00000010|0x00040000)
 
+# 新しく作成するファイルのパーミッション(open()で作成した場合と同じくumaskを反映する)
+# umaskは取得と設定を同時に行うため、書き込みを並列に行う前のインポート時に1回だけ取得する
+UMASK = os.umask(0)
+os.umask(UMASK)
+NEW_FILE_MODE = 0o666 & ~UMASK
+
+# pandas.read_excelで欠損値として扱われる文字列
+NA_STRINGS = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+              '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+
+def convert_cell_value(value):
+    """
+    セルの値をpandas.read_excelで読み込んだ場合と同じ値に変換します。
+
+    Parameters:
+    value: openpyxlで読み込んだセルの値。
+
+    Returns:
+    変換後の値。空のセル、欠損値を表す文字列とエラー値はNaN、整数値の浮動小数点数はintに変換します。
+    """
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        # エラー値(#REF!など)も欠損値として扱う
+        return np.nan if value in NA_STRINGS or value in ERROR_CODES else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_decision_sheet(file_path):
+    """
+    Excelファイルの先頭シートを値のみ読み込み、DataFrameとして返します。
+    openpyxlの読み取り専用モードで行ごとに読み込むため、スタイルを読み込まず、
+    pandasの型推論も行わないことでメモリ使用量と読み込み時間を抑えます。
+
+    Parameters:
+    file_path (str): 読み込むExcelファイルのパス。
+
+    Returns:
+    DataFrame: pd.read_excel(header=None)と同じ行・列の位置で値を格納したDataFrame(すべての列はobject型)。
+    """
+    if not file_path.endswith('.xlsx'):
+        # openpyxlで読み込めない形式はpandasで読み込む
+        return pd.read_excel(file_path, sheet_name=0, header=None)
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        rows = []
+        last_row = 0
+        max_width = 0
+        for row in ws.iter_rows(values_only=True):
+            values = [convert_cell_value(value) for value in row]
+            # 行末の空のセルを除外
+            width = len(values)
+            while width > 0 and values[width - 1] is np.nan:
+                width -= 1
+            del values[width:]
+            rows.append(values)
+            if width > 0:
+                last_row = len(rows)
+                max_width = max(max_width, width)
+    finally:
+        wb.close()
+
+    # 末尾の空の行を除外し、列数を揃える
+    data = np.full((last_row, max_width), np.nan, dtype=object)
+    for i, values in enumerate(rows[:last_row]):
+        data[i, :len(values)] = values
+    return pd.DataFrame(data)
+
+
+# 配列の要素を示すキー(例:items[0])
+ARRAY_KEY_PATTERN = re.compile(r'(.+)\[(\d+)]')
+
+
+@lru_cache(maxsize=65536)
+def compile_json_path(path):
+    """
+    ドットで区切られたパスを、値を設定する際にたどる手順のリストに変換します。
+    同じパスは一度だけ解析し、以降は解析済みの手順を再利用します。
+
+    Parameters:
+    path (str): ドットで区切られたパス。
+
+    Returns:
+    tuple: (キー名, 配列のインデックス)のタプル。配列でないキーのインデックスはNone。
+    """
+    steps = []
+    for key in path.split('.'):
+        if '[' in key and ']' in key:
+            match = ARRAY_KEY_PATTERN.match(key)
+            if match is None:
+                raise ValueError(f"Invalid array index in key '{key}'. ")
+            array_name, index_str = match.groups()
+            steps.append((array_name, int(index_str)))
+        else:
+            steps.append((key, None))
+    return tuple(steps)
+
+
 def set_nested_value(d, path, value):
     """
     ドットで区切られたパスに基づいて、入れ子になった辞書またはリストに値を設定します。
@@ -30,187 +145,105 @@ def set_nested_value(d, path, value):
     d (dict): 値を設定する対象の辞書。
     path (str): 値を設定する位置を示すドットで区切られたパス。
     value (str): 設定する値。
+
+    Returns:
+    str: エラーメッセージ。エラーがない場合は空文字。
     """
 
     if value == "\"\"":
         value = ""
-    keys = path.split('.')
-    if keys[len(keys)-1] == "":
+
+    try:
+        steps = compile_json_path(path)
+    except Exception as e:
+        return f"{e}"
+
+    final_key, final_index = steps[-1]
+    if final_key == "":
         return "Key name is not set correctly. "
-    
+
     try:
-        for key in keys[:-1]:
-            if '[' in key and ']' in key:
-                array_name, index_str = re.match(r'(.+)\[(\d+)]', key).groups()
-                index = int(index_str)
-                d = d.setdefault(array_name, [])
+        for key, index in steps[:-1]:
+            if index is not None:
+                d = d.setdefault(key, [])
                 while len(d) <= index:
                     d.append({})
                 d = d[index]
             else:
-                d = d.setdefault(key,{})
-    except Exception as e:
-        return f"{e}"
+                d = d.setdefault(key, {})
 
-    final_key = keys[-1]
-
-    try:
-        if '[' in final_key and ']' in final_key:
-            array_name, index_str = re.match(r'(.+)\[(\d+)]', final_key).groups()
-            index = int(index_str)
-            d = d.setdefault(array_name, [])
-            while len(d) <= index:
+        if final_index is not None:
+            d = d.setdefault(final_key, [])
+            while len(d) <= final_index:
                 d.append({})
-            d = d[index]
+            d[final_index] = value
         else:
-            d = d.setdefault(key, {})
+            d[final_key] = value
     except Exception as e:
         return f"{e}"
 
     return ""
 
 
-def process_column(full_df, df, start_col, check_value, process_row_func):
+def index_sections(df):
     """
-    特定の条件に基づいてDataFrameの各列を処理し、条件に合致する各行に関数を適用します。
-    「テストケース」行を基準にしてヘッダー行のインデックスを動的に決定します。
+    DataFrameの1列目と3列目を一度だけ走査し、各セクションの位置をまとめて取得します。
+    1列目は結合セル(「Condition」「Expected result」)の範囲、3列目は各見出し行の位置を取得します。
 
     Parameters:
-    full_df (DataFrame): 処理対象の完全なDataFrame。
-    df (DataFrame): 処理する関連する列を含むDataFrame。
-    start_col (int): 処理を開始する最初の列のインデックス。
-    check_value (str): 各列でチェックする値。
-    process_row_func (function): 条件に合致する各行に適用する関数。
-
-    Returns:
-    tuple: 結果の辞書とログメッセージのリストを含むタプル。
-    """
-    results = {}
-    log_messages = []
-    errMsgList = []
-
-    # 「テストケース」が含まれる行のインデックスを特定する
-    test_case_row_index = full_df.index[full_df.iloc[:, 2].astype(str) == "テストケース"].tolist()
-    if not test_case_row_index:
-        log_messages.append("The row 'テストケース' could not be found.")
-        return results, log_messages
-    test_case_row_index = test_case_row_index[0] + 1  # テストケースが結合セルのため、の次の行がヘッダー行
-
-    # ヘッダー行は「テストケース」行にある
-    header_row_index = test_case_row_index
-
-    for col_index, column in enumerate(full_df.columns[start_col:], start=start_col):
-        # ヘッダー行が欠けているかどうかを確認
-        if pd.isna(full_df.iloc[header_row_index, col_index]):
-            log_messages.append(f"Column header is missing for column index {col_index}. Skipping this column.")
-            continue
-        checkmark_mask = df.iloc[:, col_index] == check_value
-        if not checkmark_mask.any():
-            log_messages.append(f"No '{check_value}' found in the test case column '{column}'. Skipping this column.")
-            continue
-        marked_rows_df = df[checkmark_mask]
-        result = {}
-        for _, row in marked_rows_df.iterrows():
-            errMsg = ""
-            errMsg = process_row_func(result, row)
-            if errMsg != None and errMsg != "":
-                errMsgList.append(str(errMsg) + "Line " + str(row.name +1))
-
-        if "" in result:
-            results[column] = result[""]
-        else:
-            results[column] = result
-    return results, log_messages, errMsgList
-
-
-def find_merged_cell_ranges(df, column_index):
-    """
-    特定の列における結合されたセルの開始行と終了行のインデックスを見つけます。
-
-    パラメータ:
     df (DataFrame): 検索対象のDataFrame。
-    column_index (int): 結合されたセルを検索する列のインデックス。
 
-    戻り値:
-    list of tuples: 各タプルが結合されたセルの開始行と終了行のインデックスを含むリスト。
-    """
-    merged_ranges = []
-    current_start = None
-    for i, value in enumerate(df.iloc[:, column_index]):
-        if pd.notna(value) and current_start is None:
-            # Start of a new merged cell
-            current_start = i
-        elif pd.isna(value) and current_start is not None:
-            # Inside a merged cell
-            continue
-        elif pd.notna(value) and current_start is not None:
-            # End of a merged cell
-            merged_ranges.append((current_start, i - 1))
-            current_start = i
-    # Ensure the last merged cell range is added
-    if current_start is not None:
-        merged_ranges.append((current_start, len(df) - 1))
-    return merged_ranges
-
-
-def get_last_row_of_merged_cell(df, column_index, search_value):
-    """
-    特定の列において、指定した値を含む結合されたセルの最後の行のインデックスを取得します。
-
-    パラメータ:
-    df (DataFrame): 検索対象のDataFrame。
-    column_index (int): 結合されたセルを検索する列のインデックス。
-    search_value (str): 結合されたセル内で検索する値。
-
-    戻り値:
-    int: 検索した値を含む結合されたセルの最後の行のインデックス、見つからない場合は-1。
-    """
-    merged_ranges = find_merged_cell_ranges(df, column_index)
-    for start, end in merged_ranges:
-        if df.iloc[start, column_index] == search_value:
-            return end
-    return -1
-
-
-def find_last_rows(df, column_index, search_value):
-    """
-    特定の列において、指定した値を含む結合されたセルの最後の行のインデックスをすべて取得します。
-
-    パラメータ:
-    df (DataFrame): 検索対象のDataFrame。
-    column_index (int): 結合されたセルを検索する列のインデックス。
-    search_value (str): 結合されたセル内で検索する値。
-
-    戻り値:
-    list: 検索した値を含む結合されたセルの最後の行のインデックスのリスト。
+    Returns:
+    dict: 各セクションの行のインデックスを格納した辞書。
+        condition_last_rows: 「Condition」の結合セルの最後の行のリスト
+        expected_result_last_rows: 「Expected result」の結合セルの最後の行のリスト
+        request_param_rows: 「リクエストパラメータ」の行のリスト
+        response_param_rows: 「レスポンスパラメータ」の行のリスト
+        test_case_rows: 「テストケース」の行のリスト
+        test_case_no_rows: 「テストケースNo.」の行のリスト
+        asta_id_rows: 「ASTAID」を含む行のリスト
     """
-    merged_ranges = find_merged_cell_ranges(df, column_index)
-    last_rows = []
-    for start, end in merged_ranges:
-        if df.iloc[start, column_index] == search_value:
-            last_rows.append(end)
-    return last_rows
-
-
-def create_json_objects(df):
+    # 1列目:値が入っている行から次に値が入っている行の前までを1つの結合セルとする
+    first_column = df.iloc[:, 0].to_numpy(dtype=object)
+    starts = np.flatnonzero(pd.notna(first_column))
+    ends = np.append(starts[1:] - 1, len(df) - 1) if starts.size else starts
+    start_values = first_column[starts]
+
+    # 3列目:見出しの文字列と一致する行
+    third_column = df.iloc[:, 2].astype(str)
+    labels = third_column.to_numpy(dtype=object)
+
+    return {
+        'condition_last_rows': ends[start_values == 'Condition'].tolist(),
+        'expected_result_last_rows': ends[start_values == 'Expected result'].tolist(),
+        'request_param_rows': np.flatnonzero(labels == "リクエストパラメータ").tolist(),
+        'response_param_rows': np.flatnonzero(labels == "レスポンスパラメータ").tolist(),
+        'test_case_rows': np.flatnonzero(labels == "テストケース").tolist(),
+        'test_case_no_rows': np.flatnonzero(labels == "テストケースNo.").tolist(),
+        'asta_id_rows': np.flatnonzero(third_column.str.contains("ASTAID", regex=False).to_numpy()).tolist(),
+    }
+
+
+def create_json_objects(model, sections):
     """
-    DataFrameからJSONオブジェクトを生成します。複数の「Condition」と「Expected result」のペアを考慮します。
+    ディシジョンテーブルのモデルからJSONオブジェクトを生成します。複数の「Condition」と「Expected result」のペアを考慮します。
 
     パラメータ:
-    df (DataFrame): JSONオブジェクトを生成する元となるDataFrame。
+    model (DecisionTableModel): シートから作成したモデル。
+    sections (dict): シートのindex_sectionsの戻り値。
 
     戻り値:
     dict: 生成されたJSONオブジェクト。
     """
 
-    def process_row_for_json(result, row):
+    def process_row_for_json(result, key, value):
 
         try:
-            json_path = row.iloc[3].strip('$')  # キーは4列目
+            json_path = key.strip('$')  # キーは4列目
         except Exception as e:
             return "No value set for key name. "
 
-        value = row.iloc[5]  # 値は6列目
+        # 値は6列目
         # NaNをNoneに変換
         value = None if pd.isna(value) else value
         # "True"と"False"をbooleanに変換
@@ -223,35 +256,34 @@ def create_json_objects(df):
         return set_nested_value(result, json_path, value if value != '[]' else [])
 
     # Find the starting and ending row indices for each 'Expected result' section
-    response_param_row_indices = df.index[df.iloc[:, 2].astype(str) == "レスポンスパラメータ"].tolist()
-    last_row_of_expected_results = find_last_rows(df, 0, 'Expected result')
+    response_param_row_indices = sections['response_param_rows']
 
     log_messages = []  # ログメッセージを格納するリスト
     json_objects = {}
     errMsgsList = []
     for i in range(len(response_param_row_indices)):
-        response_params_df = df.iloc[response_param_row_indices[i] + 1:last_row_of_expected_results[i] + 1]
-        result, msgs = process_column(df, response_params_df, 5, '●', process_row_for_json)
+        result, msgs, errMsgs = model.process_section(DecisionTableModel.RESPONSE, i, process_row_for_json, '●')
         json_objects[f"ExpectedResult_{i + 1}"] = result
         log_messages.extend(msgs)  # ログメッセージを追加
+        errMsgsList.append(errMsgs)  # エラーメッセージを追加
 
     return json_objects, log_messages, errMsgsList  # タプルとして返す
 
 
-def create_properties_json(df):
+def create_properties_json(model, sections):
     """
-    DataFrameからプロパティオブジェクトを生成します。複数の「Condition」と「Expected result」のペアを考慮します。
+    ディシジョンテーブルのモデルからプロパティオブジェクトを生成します。複数の「Condition」と「Expected result」のペアを考慮します。
 
     パラメータ:
-    df (DataFrame): プロパティオブジェクトを生成する元となるDataFrame。
+    model (DecisionTableModel): シートから作成したモデル。
+    sections (dict): シートのindex_sectionsの戻り値。
 
     戻り値:
     dict: 生成されたプロパティオブジェクト。
     """
 
-    def process_row_for_properties(result, row):
-        key = row.iloc[3]  # キーは4列目
-        value = row.iloc[5]  # 値は6列目
+    def process_row_for_properties(result, key, value):
+        # キーは4列目、値は6列目
         if pd.isna(key):
             # key名がnanの場合
             return "key name is not set. "
@@ -270,23 +302,175 @@ def create_properties_json(df):
 
 
     # Find the starting and ending row indices for each 'Condition' section
-    request_param_row_indices = df.index[df.iloc[:, 2].astype(str) == "リクエストパラメータ"].tolist()
-    last_row_of_conditions = find_last_rows(df, 0, 'Condition')
+    request_param_row_indices = sections['request_param_rows']
 
     log_messages = []  # ログメッセージを格納するリスト
     properties_objects = {}
     errMsgsList = []
     for i in range(len(request_param_row_indices)):
-        params_df = df.iloc[request_param_row_indices[i] + 1:last_row_of_conditions[i] + 1]
-        result, msgs = process_column(df, params_df, 5, '●', process_row_for_properties)
+        result, msgs, errMsgs = model.process_section(DecisionTableModel.REQUEST, i, process_row_for_properties, '●')
         properties_objects[f"Condition_{i + 1}"] = result
         log_messages.extend(msgs)  # ログメッセージを追加
+        errMsgsList.append(errMsgs)  # エラーメッセージを追加
 
     return properties_objects, log_messages, errMsgsList  # タプルとして返す
 
-def write_to_files(objects, directory, asta_id_values, column_to_test_case_no_map, file_extension, process_item_func):
+# 出力したファイルのフィンガープリントを記録するディレクトリ名(OutputDirectoryの直下、ExportCacheDirectory未設定時)
+EXPORT_CACHE_DIR_NAME = '.export_cache'
+# 以前のバージョンで出力先ディレクトリに作成していたフィンガープリントのファイル名
+LEGACY_EXPORT_CACHE_FILE_NAME = '.export_cache'
+# 出力形式を変更した場合は記録したフィンガープリントを無効にするためのバージョン
+EXPORT_CACHE_VERSION = 1
+
+
+def create_fingerprint(file_extension, content):
+    """
+    ファイルに書き込む内容のフィンガープリントを作成します。
+
+    Parameters:
+    file_extension (str): 作成するファイルの拡張子。
+    content: ファイルに書き込むオブジェクト(ケースごとに●が付いている行のキーと値)。
+
+    Returns:
+    str: フィンガープリント。
+    """
+    return hashlib.sha256(f"{file_extension}:{content!r}".encode('utf-8')).hexdigest()
+
+
+def get_export_cache_path(cache_dir, directory):
+    """
+    出力先ディレクトリのフィンガープリントを記録するファイルのパスを取得します。
+    出力先ディレクトリは後続の処理で使用するため、記録するファイルは出力先とは別のディレクトリに作成します。
+
+    Parameters:
+    cache_dir (str): フィンガープリントを記録するディレクトリ。
+    directory (str): ファイルを書き込むディレクトリ。
+
+    Returns:
+    str: フィンガープリントを記録するファイルのパス。
+    """
+    directory_hash = hashlib.sha256(os.path.abspath(directory).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(os.path.normpath(directory))}_{directory_hash}.json")
+
+
+def load_export_cache(cache_path, directory):
+    """
+    出力先ディレクトリについて記録したフィンガープリントを読み込みます。
+
+    Parameters:
+    cache_path (str): フィンガープリントを記録したファイルのパス。
+    directory (str): ファイルを書き込むディレクトリ。
+
+    Returns:
+    dict: ファイル名をキーに、フィンガープリントとファイルのサイズ・更新日時を格納した辞書。読み込めない場合は空の辞書。
+    """
+    try:
+        with open(cache_path, encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != EXPORT_CACHE_VERSION or cache.get('directory') != os.path.abspath(directory):
+        return {}
+    return cache.get('files', {})
+
+
+def save_export_cache(cache_path, directory, files):
+    """
+    出力先ディレクトリについてフィンガープリントを記録します。
+
+    Parameters:
+    cache_path (str): フィンガープリントを記録するファイルのパス。
+    directory (str): ファイルを書き込んだディレクトリ。
+    files (dict): ファイル名をキーに、フィンガープリントとファイルのサイズ・更新日時を格納した辞書。
+    """
+    Path(os.path.dirname(cache_path)).mkdir(parents=True, exist_ok=True)
+    text = json.dumps({'version': EXPORT_CACHE_VERSION, 'directory': os.path.abspath(directory), 'files': files},
+                      ensure_ascii=False, indent=1)
+    write_text_atomic(cache_path, text, 'utf-8')
+
+
+def is_unchanged_file(file_path, fingerprint, cached):
+    """
+    前回出力したファイルから内容が変わっていないかを判定します。
+    ファイルが前回の出力後に変更・削除されている場合は変わっているものとします。
+
+    Parameters:
+    file_path (str): 出力するファイルのパス。
+    fingerprint (str): 今回書き込む内容のフィンガープリント。
+    cached (dict): 前回記録したフィンガープリントとファイルのサイズ・更新日時。ない場合はNone。
+
+    Returns:
+    bool: 変わっていない場合はTrue。
+    """
+    if cached is None or cached['fingerprint'] != fingerprint:
+        return False
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return False
+    return stat.st_size == cached['size'] and stat.st_mtime_ns == cached['mtime']
+
+
+def write_text_atomic(file_path, text, encoding):
+    """
+    テキストをファイルに書き込みます。
+    同じディレクトリの一時ファイルに書き込んでから置き換えるため、書き込み途中のファイルが残りません。
+    一時ファイルは所有者のみ読み書きできる状態で作成されるため、置き換える前に既存のファイルと同じ
+    (新しく作成する場合はumaskを反映した)パーミッションを設定します。
+
+    Parameters:
+    file_path (str): 書き込むファイルのパス。
+    text (str): 書き込むテキスト。
+    encoding (str): 文字コード。
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.', suffix='.tmp')
+    try:
+        with open(fd, 'w', encoding=encoding) as file:
+            file.write(text)
+        try:
+            mode = os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_files(files, worker_num=1):
+    """
+    複数のファイルを書き込み、書き込みが完了したファイルのパスを指定した順番で返します。
+    worker_numが2以上の場合は、スレッドで並列に書き込みます。
+
+    Parameters:
+    files (list): (ファイルのパス, 書き込むテキスト, 文字コード)のリスト。
+    worker_num (int): 並列に書き込む数。
+
+    Returns:
+    generator: 書き込みが完了したファイルのパス。書き込みに失敗した場合はその時点で例外を送出します。
+    """
+    if worker_num <= 1 or len(files) <= 1:
+        for file_path, text, encoding in files:
+            write_text_atomic(file_path, text, encoding)
+            yield file_path
+        return
+
+    with ThreadPoolExecutor(max_workers=worker_num) as executor:
+        futures = [executor.submit(write_text_atomic, file_path, text, encoding) for file_path, text, encoding in files]
+        for (file_path, text, encoding), future in zip(files, futures):
+            future.result()
+            yield file_path
+
+
+def write_to_files(objects, directory, asta_id_values, column_to_test_case_no_map, file_extension, process_item_func,
+                   cache_dir=None):
     """
     指定されたディレクトリにオブジェクトをファイルとして書き込みます。
+    cache_dirを指定した場合、前回の出力から内容が変わっていないファイルは書き込みません。
 
     Parameters:
     objects (dict): ファイルに書き込むオブジェクト。
@@ -294,7 +478,8 @@ def write_to_files(objects, directory, asta_id_values, column_to_test_case_no_ma
     asta_id_values (list): ファイル名に含めるASTA IDのリスト。
     column_to_test_case_no_map (dict): 列のインデックスからテストケース番号へのマッピング。
     file_extension (str): 作成するファイルの拡張子。
-    process_item_func (function): ファイルに書き込む前に各アイテムを処理する関数。
+    process_item_func (function): 各アイテムをファイルに書き込むテキストに変換する関数。
+    cache_dir (str): 出力したファイルのフィンガープリントを記録するディレクトリ。Noneの場合はすべてのファイルを書き込みます。
     """
     if file_extension == "properties":
         rename_file(0,asta_id_values)
@@ -309,9 +494,22 @@ def write_to_files(objects, directory, asta_id_values, column_to_test_case_no_ma
         temp = temp.group()
         directory = os.path.join(directory,temp)
 
+    # 前回出力したファイルのフィンガープリント
+    cache_path = get_export_cache_path(cache_dir, directory) if cache_dir is not None else None
+    export_cache = load_export_cache(cache_path, directory) if cache_path is not None else {}
+    cache_updated = False
+    skipped_count = 0
+    # 書き込むファイル(ファイル名, フィンガープリント, (ファイルのパス, テキスト, 文字コード))
+    pending_files = []
+
     try:
         Path(directory).mkdir(parents=True, exist_ok=True)
 
+        # 以前のバージョンで出力先ディレクトリに作成したフィンガープリントのファイルは削除する
+        legacy_cache_path = os.path.join(directory, LEGACY_EXPORT_CACHE_FILE_NAME)
+        if os.path.isfile(legacy_cache_path):
+            os.remove(legacy_cache_path)
+
         # 各ASTAIDとテストケース番号の組み合わせごとに出現回数をカウント
         occurrence_counts = defaultdict(int)
         for obj_key in objects.keys():
@@ -337,44 +535,85 @@ def write_to_files(objects, directory, asta_id_values, column_to_test_case_no_ma
                                                                                      file_base_name] > 1 else f"{file_base_name}.{file_extension}"
                 filename = filename.replace('/', '-').replace('\\', '-').strip()
                 file_path = os.path.join(directory, filename)
+
+                # ケースの内容が前回の出力から変わっていない場合は書き込まない
+                fingerprint = create_fingerprint(file_extension, content)
+                if is_unchanged_file(file_path, fingerprint, export_cache.get(filename)):
+                    skipped_count += 1
+                    continue
+
                 defaultEncod = 'utf-8'
                 if file_path.endswith(".properties"):
                     defaultEncod = 'MS932'
 
-                with open(file_path, 'w', encoding=defaultEncod) as file:
-                    process_item_func(file, content)
-
-                # Jsonを出力した際、勝手に特定の文字がエスケープされてしまう。
-                # ※￥nの文字列が￥￥nで保存されてしまう
-                # 保存したJsonファイルをテキストとして読み込み置換して「￥n」を「￥￥”」を「￥”」に変更する
-                if (file_path.endswith(".json")):
-                    with open(file_path, encoding=defaultEncod) as file:
-                        data = file.read()
+                # 書き込むテキストをメモリ上で作成し、ファイルへの書き込みは最後にまとめて行う
+                pending_files.append((filename, fingerprint, (file_path, process_item_func(content), defaultEncod)))
 
-                    data = data.replace("\\\\n","\\n")
-                    data = data.replace("\\\\","\\")
-
-                    with open(file_path, 'w', encoding=defaultEncod) as file:
-                        file.write(data)
-                else:
-                    # propertiesを出力した際、配列項目で空文字を設定している場合、ダブルクォーテーションが入ってしまう
-                    # ※「"",1,2,"",""」のように空文字の箇所にダブルクォーテーションが入る
-                    # 保存したJsonファイルをテキストとして読み込み置換して「"",」を「,」、「""\n」を「\n」に変換する
-                    with open(file_path, 'w', encoding=defaultEncod) as file:
-                        data = file.read()
-
-                    data = re.sub('"",', ',', data)
-                    data = re.sub('""\n', '\\n', data)
-
-                    with open(file_path, 'w', encoding=defaultEncod) as file:
-                        file.write(data)
+        # ファイルを書き込み、書き込みが完了したファイルを記録する
+        for (filename, fingerprint, write_args), file_path in zip(
+                pending_files, write_files([write_args for filename, fingerprint, write_args in pending_files], writeWorkerNum)):
+            stat = os.stat(file_path)
+            export_cache[filename] = {'fingerprint': fingerprint, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+            cache_updated = True
 
+        if skipped_count > 0:
+            logger.info(f"{skipped_count} {file_extension.upper()} files are unchanged and were not rewritten.")
         logger.info(f"{file_extension.upper()} files have been successfully written to the directory: {directory}")
     except Exception as e:
         logger.error(f"Failed to write {file_extension.upper()} files: {e}")
         raise
+    finally:
+        # 途中でエラーが発生した場合も、書き込み済みのファイルは記録する
+        if cache_updated and cache_path is not None:
+            save_export_cache(cache_path, directory, export_cache)
+
+def serialize_json(json_obj):
+    """
+    JSONオブジェクトをファイルに書き込むテキストに変換します。
+
+    Parameters:
+    json_obj (dict): 変換するJSONオブジェクト。
 
-def write_json_to_files(json_objects, directory, asta_id_values, column_to_test_case_no_map):
+    Returns:
+    str: ファイルに書き込むテキスト。
+    """
+    data = json.dumps(json_obj, ensure_ascii=False, indent=4)
+
+    # Jsonを出力した際、勝手に特定の文字がエスケープされてしまう。
+    # ※￥nの文字列が￥￥nで保存されてしまう
+    # 「￥￥n」を「￥n」に、「￥￥」を「￥」に変更する
+    data = data.replace("\\\\n","\\n")
+    data = data.replace("\\\\","\\")
+    return data
+
+
+def serialize_properties(properties):
+    """
+    プロパティオブジェクトをファイルに書き込むテキストに変換します。
+
+    Parameters:
+    properties (dict): 変換するプロパティオブジェクト。
+
+    Returns:
+    str: ファイルに書き込むテキスト。
+    """
+    lines = []
+    for key, value in properties.items():
+        if pd.isna(value) or value == '""':
+            lines.append(f"{key}=\n")
+        else:
+            lines.append(f"{key}={value}\n")
+    data = ''.join(lines)
+
+    # propertiesを出力した際、配列項目で空文字を設定している場合、ダブルクォーテーションが入ってしまう
+    # ※「"",1,2,"",""」のように空文字の箇所にダブルクォーテーションが入る
+    # 「"",」を「,」、「""\n」を「\n」に変換する
+    data = re.sub('"",', ',', data)
+    data = re.sub('""\n', '\\n', data)
+    return data
+
+
+def write_json_to_files(json_objects, directory, asta_id_values, column_to_test_case_no_map, cache_dir=None):
     """
     JSONオブジェクトをファイルとして書き込みます。
 
@@ -383,17 +622,15 @@ def write_json_to_files(json_objects, directory, asta_id_values, column_to_test_
     directory (str): ファイルを書き込むディレクトリ。
     asta_id_values (list): ファイル名に含めるASTA IDのリスト。
     column_to_test_case_no_map (dict): 列のインデックスからテストケース番号へのマッピング。
+    cache_dir (str): 出力したファイルのフィンガープリントを記録するディレクトリ。
     """
 
-    def process_json(file, json_obj):
-        json.dump(json_obj, file, ensure_ascii=False, indent=4)
-
     logger.info('json_dir')
     logger.info(directory)
-    write_to_files(json_objects, directory, asta_id_values, column_to_test_case_no_map, 'json', process_json)
+    write_to_files(json_objects, directory, asta_id_values, column_to_test_case_no_map, 'json', serialize_json, cache_dir)
 
 
-def write_properties_to_files(properties_objects, directory, asta_id_values, column_to_test_case_no_map):
+def write_properties_to_files(properties_objects, directory, asta_id_values, column_to_test_case_no_map, cache_dir=None):
     """
     プロパティオブジェクトをファイルとして書き込みます。
 
@@ -402,19 +639,13 @@ def write_properties_to_files(properties_objects, directory, asta_id_values, col
     directory (str): ファイルを書き込むディレクトリ。
     asta_id_values (list): ファイル名に含めるASTA IDのリスト。
     column_to_test_case_no_map (dict): 列のインデックスからテストケース番号へのマッピング。
+    cache_dir (str): 出力したファイルのフィンガープリントを記録するディレクトリ。
     """
 
-    def process_properties(file, properties):
-        for key, value in properties.items():
-            if pd.isna(value) or value == '""':
-                file.write(f"{key}=\n")
-            else:
-                file.write(f"{key}={value}\n")
-
     logger.info('properties_dir')
     logger.info('directory')
     write_to_files(properties_objects, directory, asta_id_values, column_to_test_case_no_map, 'properties',
-                   process_properties)
+                   serialize_properties, cache_dir)
 
 def rename_file(type, asta_id_values):
     """
@@ -445,20 +676,135 @@ def rename_file(type, asta_id_values):
                 asta_id_values[i] = "Result_ASTAID_" + temp
     logger.info("after:" + (", ").join(asta_id_values))
 
-def find_asta_ids(df):
+def find_asta_ids(df, sections=None):
     """
     DataFrame内のすべてのASTAIDを見つけてリストとして返します。
 
     Parameters:
     df (DataFrame): 検索対象のDataFrame。
+    sections (dict): dfのindex_sectionsの戻り値。省略時はdfを検索します。
 
     Returns:
     list: 発見されたASTAIDのリスト。
     """
-    asta_id_row_indices = df.index[df.iloc[:, 2].astype(str).str.contains("ASTAID", na=False)].tolist()
+    if sections is None:
+        sections = index_sections(df)
+    asta_id_row_indices = sections['asta_id_rows']
     return [df.iloc[idx, 3] for idx in asta_id_row_indices]
 
 
+def load_decision_table(file_path):
+    """
+    単一のExcelファイルを読み込み、出力するJSONおよびプロパティのオブジェクトを生成します。
+    ファイルの書き込みは行わないため、複数プロセスで並列に実行できます。
+
+    パラメータ:
+    file_path (str): 処理するExcelファイルのパス。
+
+    戻り値:
+    dict: ファイルの書き込みに必要なオブジェクトを格納した辞書。エラーがある場合はNone。
+    """
+    data = read_decision_sheet(file_path)
+    # 各セクションの位置はここで一度だけ検索し、以降の処理で共有する
+    sections = index_sections(data)
+    test_case_no_row_index = sections['test_case_no_rows']
+    if not test_case_no_row_index:
+        logger.error("The row 'テストケースNo.' could not be found.")
+        return None
+    test_case_no_row_index = test_case_no_row_index[0]
+    test_case_no_row = data.iloc[test_case_no_row_index]
+    column_to_test_case_no_map = {col_index: int(test_case_no) for col_index, test_case_no in
+                                  enumerate(test_case_no_row[5:], start=5) if pd.notnull(test_case_no)}
+    asta_id_values = find_asta_ids(data, sections)  # ASTAIDを取得
+
+    # シートの内容はモデルに変換し、以降はシート全体のDataFrameを保持しない
+    model = DecisionTableModel.from_sheet(data, sections)
+    del data, test_case_no_row
+
+    json_objects, creation_logs_json, resErrMsgs = create_json_objects(model, sections)
+
+    errFlg = False
+    logger.info("==========Cell with error in response param ==================")
+    for logList in resErrMsgs:
+        for log in logList:
+            logger.error(log)
+            if errFlg == False:errFlg = True
+    logger.info("==============================================================")
+    logger.info("")
+    logger.info("")
+
+    properties_objects, creation_logs_properties, reqErrMsgs = create_properties_json(model, sections)
+
+    logger.info("")
+    logger.info("")
+
+    for log in creation_logs_json + creation_logs_properties:
+        logger.info(log)
+
+    if not asta_id_values:
+        logger.error("ASTAID not found in the third column.")
+        return None
+
+    # ASTAIDリストの数とCondition/Expected resultリストの数をチェック
+    if len(asta_id_values) != len(json_objects) or len(asta_id_values) != len(properties_objects):
+        logger.error(
+            f"The number of ASTAIDs ({len(asta_id_values)}) does not match the number of conditions ({len(properties_objects)}) or expected results ({len(json_objects)}).")
+        return None
+
+    return {
+        'json_objects': json_objects,
+        'properties_objects': properties_objects,
+        'asta_id_values': asta_id_values,
+        'column_to_test_case_no_map': column_to_test_case_no_map,
+        'err_flag': errFlg,
+    }
+
+
+def write_decision_table(table, output_directory):
+    """
+    load_decision_tableで生成したオブジェクトをJSONおよびプロパティファイルとして書き込みます。
+
+    パラメータ:
+    table (dict): load_decision_tableの戻り値。
+    output_directory (str): 出力ファイルを保存するディレクトリ。
+
+    戻り値:
+    bool: ファイルを書き込んだ場合はTrue、ディシジョンテーブルにエラーがある場合はFalse。
+    """
+    # If no errors, create the file
+    global directDir, directFlg, exportCacheDir
+    subDir1 = 'json'
+    subDir2 = 'properties'
+    # フィンガープリントは出力先(DirectOutputDir)の外に記録する
+    cache_dir = exportCacheDir or os.path.join(output_directory, EXPORT_CACHE_DIR_NAME)
+    if table['err_flag'] == False:
+        if bool(directFlg) == True:
+            output_directory = directDir
+            jsonDir = os.path.join(output_directory,'responseData')
+            jsonDir = os.path.join(jsonDir,'LT')
+            propDir = os.path.join(output_directory,'requestData')
+            propDir = os.path.join(propDir,'LT')
+        else:
+            jsonDir = os.path.join(output_directory, 'json')
+            propDir = os.path.join(output_directory, 'properties')
+
+
+        write_json_to_files(table['json_objects'],
+                            jsonDir,
+                            table['asta_id_values'],
+                            table['column_to_test_case_no_map'],
+                            cache_dir)
+        write_properties_to_files(table['properties_objects'],
+                                  propDir,
+                                  table['asta_id_values'],
+                                  table['column_to_test_case_no_map'],
+                                  cache_dir)
+        return True
+    else:
+        outputMsgBox("ディシジョンテーブルの作成に失敗しました。\r\nexecute.logを確認してください！！","")
+        return False
+
+
 def process_file(file_path, output_directory):
     """
     単一のExcelファイルを処理し、その内容に基づいてJSONおよびプロパティファイルを生成します。
@@ -467,83 +813,73 @@ def process_file(file_path, output_directory):
     パラメータ:
     file_path (str): 処理するExcelファイルのパス。
     output_directory (str): 出力ファイルを保存するディレクトリ。
+
+    戻り値:
+    bool: ファイルの書き込みまで完了した場合はTrue、それ以外の場合はFalse。
     """
     try:
-        xls = pd.ExcelFile(file_path)
-        first_sheet_name = xls.sheet_names[0]
-        data = pd.read_excel(xls, first_sheet_name, header=None)
-        test_case_no_row_index = data.index[data.iloc[:, 2].astype(str) == "テストケースNo."].tolist()
-        if not test_case_no_row_index:
-            logger.error("The row 'テストケースNo.' could not be found.")
-            return
-        test_case_no_row_index = test_case_no_row_index[0]
-        test_case_no_row = data.iloc[test_case_no_row_index]
-        column_to_test_case_no_map = {col_index: int(test_case_no) for col_index, test_case_no in
-                                      enumerate(test_case_no_row[5:], start=5) if pd.notnull(test_case_no)}
-
-        json_objects, creation_logs_json, resErrMsgs = create_json_objects(data)
-
-        errFlg = False
-        logger.info("==========Cell with error in response param ==================")
-        for logList in resErrMsgs:
-            for log in logList:
-                logger.error(log)
-                if errFlg == False:errFlg = True
-        logger.info("==============================================================")
-        logger.info("")
-        logger.info("")
-
-        properties_objects, creation_logs_properties = create_properties_json(data)
-
-        logger.info("")
-        logger.info("")
-
-        for log in creation_logs_json + creation_logs_properties:
-            logger.info(log)
-
-        asta_id_values = find_asta_ids(data)  # ASTAIDを取得
-        if not asta_id_values:
-            logger.error("ASTAID not found in the third column.")
-            return
+        table = load_decision_table(file_path)
+        if table is None:
+            return False
+        return write_decision_table(table, output_directory)
+    except Exception as e:
+        logger.error(f"An error occurred while processing {file_path}: {e}")
+        logger.error(traceback.format_exc())
+        return False
 
-        # ASTAIDリストの数とCondition/Expected resultリストの数をチェック
-        if len(asta_id_values) != len(json_objects) or len(asta_id_values) != len(properties_objects):
-            logger.error(
-                f"The number of ASTAIDs ({len(asta_id_values)}) does not match the number of conditions ({len(properties_objects)}) or expected results ({len(json_objects)}).")
-            return
 
-        # If no errors, create the file
-        global directDir, directFlg
-        subDir1 = 'json'
-        subDir2 = 'properties'
-        if errFlg == False:
-            if bool(directFlg) == True:
-                output_directory = directDir
-                jsonDir = os.path.join(output_directory,'responseData')
-                jsonDir = os.path.join(jsonDir,'LT')
-                propDir = os.path.join(output_directory,'requestData')
-                propDir = os.path.join(propDir,'LT')
-            else:
-                jsonDir = os.path.join(output_directory, 'json')
-                propDir = os.path.join(output_directory, 'properties')
-
-
-            write_json_to_files(json_objects,
-                                jsonDir,
-                                asta_id_values,
-                                column_to_test_case_no_map)
-            write_properties_to_files(properties_objects,
-                                      propDir,
-                                      asta_id_values,
-                                      column_to_test_case_no_map)
-        else:
-            outputMsgBox("ディシジョンテーブルの作成に失敗しました。\r\nexecute.logを確認してください！！","")
+class LogCollector(logging.Handler):
+    """
+    子プロセスで出力されたログをファイル単位で保持するハンドラ。
+    保持したログは親プロセスでまとめて出力します。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def init_worker():
+    """
+    子プロセスの初期化処理。ログは親プロセスでファイル単位に出力するため、ファイルへの出力を止めます。
+    """
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+
+
+def load_decision_table_task(file_path):
+    """
+    子プロセスで単一のExcelファイルを読み込みます。
+
+    パラメータ:
+    file_path (str): 処理するExcelファイルのパス。
+
+    戻り値:
+    tuple: load_decision_tableの戻り値と、処理中に出力されたログ(レベル, メッセージ)のリストを含むタプル。
+    """
+    collector = LogCollector()
+    logger.addHandler(collector)
+    try:
+        table = load_decision_table(file_path)
     except Exception as e:
         logger.error(f"An error occurred while processing {file_path}: {e}")
         logger.error(traceback.format_exc())
+        table = None
+    finally:
+        logger.removeHandler(collector)
+    return table, collector.records
+
 
 directFlg = ""
 directDir = ""
+# 出力ファイルを並列に書き込む数
+writeWorkerNum = 1
+# 出力したファイルのフィンガープリントを記録するディレクトリ(空の場合はOutputDirectory直下の.export_cache)
+exportCacheDir = ""
 
 def change_file_extension(file_path, new_extension):
     #ファイル拡張子をmhtファイルに変更し、新たにファイルを作成します
@@ -551,34 +887,70 @@ def change_file_extension(file_path, new_extension):
     new_file_path = base + new_extension
     shutil.copy(file_path, new_file_path)
 
-config = configparser.ConfigParser()
-config.read('config.ini')
-folder_path = config['DEFAULT']['FolderPath']
+def create_mht_files(folder_path):
+    """
+    フォルダ内のすべてのExcelファイルをmhtファイルとして複製します。
+    子プロセスでモジュールを読み込んだ際に実行されないよう、main関数から呼び出します。
+
+    Parameters:
+    folder_path (str): 対象のフォルダ。
+    """
+    new_extension = ".mht"
+    for file_name in os.listdir(folder_path):
+        if file_name.endswith('.xlsx'):
+            file_path = os.path.join(folder_path, file_name)
+            change_file_extension(file_path, new_extension)
 
-new_extension = ".mht"
-for file_name in os.listdir(folder_path):
-    if file_name.endswith('.xlsx'):
-        file_path = os.path.join(folder_path, file_name)
-        change_file_extension(file_path, new_extension)
 def main():
     """
     入力ディレクトリ内のすべてのExcelファイルを処理し、出力ファイルを生成するメイン関数。
+    config.iniのExportWorkerNumが2以上の場合、Excelファイルの読み込みを複数プロセスで並列に実行します。
+    ファイルの書き込みは出力先の競合を避けるため、親プロセスでファイルの順番通りに行います。
     """
     config = configparser.ConfigParser()
     config.read('config.ini')
+    create_mht_files(config['DEFAULT']['FolderPath'])
+
     input_directory = config['DEFAULT']['InputDirectory']
     output_directory = config['DEFAULT']['OutputDirectory']
+    worker_num = config['DEFAULT'].getint('ExportWorkerNum', fallback=1)
+    if worker_num <= 0:
+        worker_num = os.cpu_count() or 1
 
-    global directDir,directFlg
+    global directDir,directFlg,writeWorkerNum,exportCacheDir
     directFlg = strtobool(config['DEFAULT']['DirectOutputFlg'])
     directDir = config['DEFAULT']['DirectOutputDir']
+    exportCacheDir = config['DEFAULT'].get('ExportCacheDirectory', fallback='').strip()
+    writeWorkerNum = config['DEFAULT'].getint('ExportWriteWorkerNum', fallback=1)
+    if writeWorkerNum <= 0:
+        writeWorkerNum = os.cpu_count() or 1
     try:
+        file_paths = []
         for file_name in os.listdir(input_directory):
             if file_name.startswith('decision_table') and (file_name.endswith('.xlsx') or file_name.endswith('xls')):
-                file_path = os.path.join(input_directory, file_name)
+                file_paths.append(os.path.join(input_directory, file_name))
+
+        if worker_num <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                logger.info(f"Processing file: {file_path}")
+                if process_file(file_path, output_directory):
+                    logger.info(f"Successfully processed file: {file_path}")
+            return
+
+        with ProcessPoolExecutor(max_workers=worker_num, initializer=init_worker) as executor:
+            # 読み込みは並列に行い、ログの出力とファイルの書き込みはファイルの順番通りに行う
+            for file_path, (table, records) in zip(file_paths, executor.map(load_decision_table_task, file_paths)):
                 logger.info(f"Processing file: {file_path}")
-                process_file(file_path, output_directory)
-                logger.info(f"Successfully processed file: {file_path}")
+                for level, message in records:
+                    logger.log(level, message)
+                if table is None:
+                    continue
+                try:
+                    if write_decision_table(table, output_directory):
+                        logger.info(f"Successfully processed file: {file_path}")
+                except Exception as e:
+                    logger.error(f"An error occurred while processing {file_path}: {e}")
+                    logger.error(traceback.format_exc())
     except Exception as e:
         logger.error(f"An error occurred in main: {e}")
 
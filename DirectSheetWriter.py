@@ -0,0 +1,288 @@
+import datetime
+from copy import copy
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import openpyxl
+from openpyxl.cell.cell import Cell
+from openpyxl.cell._writer import write_cell
+from openpyxl.comments.comment_sheet import CommentRecord
+from openpyxl.compat import safe_string
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.worksheet.dimensions import SheetDimension
+from openpyxl.writer.excel import ExcelWriter
+
+class VirtualRows:
+    '''
+    ダイレクト出力モードで、シート上にセルを作成せずに保持する連続した行
+    コピー元の行のスタイル・値・高さを共有し、行ごとには設定した値のみを保持する
+    セルはブックの保存時に1行ずつ作成して書き込み、書き込み後は保持しない
+    '''
+    def __init__(self, start_row, templates, row_num):
+        # 最初の行
+        self.start_row = start_row
+        # コピー元の行ごとの(列:スタイル, 列:値, 高さ)
+        self.templates = templates
+        # 行ごとのコピー元の行のインデックス
+        self.template_ids = [i % len(templates) for i in range(row_num)]
+        # 行ごとの設定した値(列:値、値を設定していない行はNone)
+        self.values = [None] * row_num
+
+    '''
+    コピー元の行からVirtualRowsを作成する関数
+    source
+    コピー元の行単位のセル
+    start_row
+    最初の行
+    amount
+    コピー元の行を繰り返す回数
+    copy_value
+    コピー元の値を設定するか
+    '''
+    @staticmethod
+    def from_source(ws, source, start_row, amount, copy_value):
+        templates = []
+        for row in source:
+            # スタイルはコピー元のセルごとに1つだけ複製し、すべての行で共有する
+            styles = {cell.column: copy(cell._style) for cell in row if cell.has_style}
+            values = {cell.column: cell.value for cell in row if copy_value and cell.value is not None}
+            templates.append((styles, values, ws.row_dimensions[row[0].row].height))
+        return VirtualRows(start_row, templates, len(source) * amount)
+
+    @property
+    def end_row(self):
+        return self.start_row + len(self.values) - 1
+
+    def __len__(self):
+        return len(self.values)
+
+    '''
+    セルの値を取得する関数
+    offset
+    最初の行からの位置
+    '''
+    def get_value(self, offset, col):
+        values = self.values[offset]
+        if values is not None and col in values:
+            return values[col]
+        return self.templates[self.template_ids[offset]][1].get(col)
+
+    '''
+    セルの値を設定する関数
+    offset
+    最初の行からの位置
+    '''
+    def set_value(self, offset, col, value):
+        if self.values[offset] is None:
+            self.values[offset] = {}
+        self.values[offset][col] = value
+
+    '''
+    指定した範囲のセルの値を空にする関数
+    すべての行が対象の場合は、コピー元の値を空にして行ごとの値は保持しない
+    first, last
+    最初の行からの位置(lastを含む)
+    min_col, max_col
+    対象の列
+    '''
+    def clear(self, first, last, min_col, max_col):
+        if first == 0 and last == len(self.values) - 1:
+            for styles, values, height in self.templates:
+                for col in [col for col in values if min_col <= col <= max_col]:
+                    del values[col]
+            for values in self.values:
+                if values is None:
+                    continue
+                for col in [col for col in values if min_col <= col <= max_col]:
+                    del values[col]
+            return
+
+        for offset in range(first, last + 1):
+            for col in range(min_col, max_col + 1):
+                if self.get_value(offset, col) is not None:
+                    self.set_value(offset, col, None)
+
+    '''
+    行を削除する関数
+    first
+    削除する最初の行の最初の行からの位置
+    amount
+    削除する行数
+    '''
+    def delete(self, first, amount):
+        del self.template_ids[first:first + amount]
+        del self.values[first:first + amount]
+
+    '''
+    指定した位置で分割し、後半の行を新しいVirtualRowsとして取得する関数
+    offset
+    分割する位置(この行から後半)
+    '''
+    def split(self, offset):
+        # コピー元の値は範囲ごとに空にするため、前半と共有しない
+        tail = VirtualRows(self.start_row + offset, [(styles, dict(values), height) for styles, values, height in self.templates], 0)
+        tail.template_ids = self.template_ids[offset:]
+        tail.values = self.values[offset:]
+        del self.template_ids[offset:]
+        del self.values[offset:]
+        return tail
+
+    '''
+    行の高さを取得する関数
+    '''
+    def height(self, offset):
+        return self.templates[self.template_ids[offset]][2]
+
+    '''
+    1行分のセルを作成する関数
+    作成したセルはシートに追加しない
+    ws
+    シートのオブジェクト
+    offset
+    最初の行からの位置
+    戻り値
+    列:セル
+    '''
+    def create_cells(self, ws, offset):
+        styles, template_values, height = self.templates[self.template_ids[offset]]
+        values = self.values[offset] or {}
+        row_idx = self.start_row + offset
+        cells = {}
+        for col in sorted(styles.keys() | template_values.keys() | values.keys()):
+            value = values[col] if col in values else template_values.get(col)
+            cells[col] = Cell(ws, row=row_idx, column=col, value=value, style_array=styles.get(col))
+        return cells
+
+
+class DirectWorksheetWriter(WorksheetWriter):
+    '''
+    シート上のセルとVirtualRowsの行を行番号順に1行ずつ書き込むWorksheetWriter
+    '''
+    def __init__(self, ws, virtual_rows, out=None):
+        self.virtual_rows = virtual_rows
+        super().__init__(ws, out)
+
+    def write_dimensions(self):
+        min_col, min_row, max_col, max_row = range_boundaries(self.ws.calculate_dimension())
+        for rows in self.virtual_rows:
+            if len(rows) > 0:
+                min_row = min(min_row, rows.start_row)
+                max_row = max(max_row, rows.end_row)
+        dim = SheetDimension(f'{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max_row}')
+        self.xf.send(dim.to_tree())
+
+    '''
+    シート上の行とVirtualRowsの行を行番号順に返す関数
+    戻り値
+    (行番号, セルのリスト, VirtualRowsの行の高さ(シート上の行の場合はNone))
+    '''
+    def iter_rows(self):
+        real_rows = iter(self.rows())
+        real = next(real_rows, None)
+        for rows in sorted(self.virtual_rows, key=lambda rows: rows.start_row):
+            for offset in range(len(rows)):
+                row_idx = rows.start_row + offset
+                while real is not None and real[0] < row_idx:
+                    yield real[0], real[1], None
+                    real = next(real_rows, None)
+
+                cells = rows.create_cells(self.ws, offset)
+                if real is not None and real[0] == row_idx:
+                    # シート上に値・スタイルがあるセルはシート上のセルを優先する
+                    for cell in real[1]:
+                        if cell._value is not None or cell.has_style:
+                            cells[cell.column] = cell
+                    real = next(real_rows, None)
+                yield row_idx, [cells[col] for col in sorted(cells)], rows.height(offset)
+
+        while real is not None:
+            yield real[0], real[1], None
+            real = next(real_rows, None)
+
+    def write_rows(self):
+        xf = self.xf.send(True)
+
+        with xf.element("sheetData"):
+            for row_idx, row, height in self.iter_rows():
+                self.write_row(xf, row, row_idx, height)
+
+        self.xf.send(None)
+
+    def write_row(self, xf, row, row_idx, height=None):
+        attrs = {'r': f"{row_idx}"}
+        attrs.update(self.ws.row_dimensions.get(row_idx, {}))
+        if height is not None and 'ht' not in attrs:
+            # VirtualRowsの行はコピー元の行の高さを設定する
+            attrs['ht'] = safe_string(height)
+            attrs['customHeight'] = '1'
+
+        with xf.element("row", attrs):
+            for cell in row:
+                if cell._comment is not None:
+                    self.ws._comments.append(CommentRecord.from_cell(cell))
+                if cell._value is None and not cell.has_style and not cell._comment:
+                    continue
+                write_cell(xf, self.ws, cell, cell.has_style)
+
+
+class DirectExcelWriter(ExcelWriter):
+    '''
+    指定したシートのみDirectWorksheetWriterで書き込むExcelWriter
+    '''
+    def __init__(self, workbook, archive, worksheet, virtual_rows):
+        super().__init__(workbook, archive)
+        self.worksheet = worksheet
+        self.virtual_rows = virtual_rows
+
+    def write_worksheet(self, ws):
+        if ws is not self.worksheet:
+            return super().write_worksheet(ws)
+
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        writer = DirectWorksheetWriter(ws, self.virtual_rows)
+        writer.write()
+
+        ws._rels = writer._rels
+        self._archive.write(writer.out, ws.path[1:])
+        self.manifest.append(ws)
+        writer.cleanup()
+
+
+class DirectSheetWriter:
+    '''
+    ダイレクト出力モードでブックを保存するクラス
+    名前付き範囲・入力規則・条件付き書式等はブックの内容をそのまま1回だけ書き込み、
+    VirtualRowsの行は保存時に1行ずつセルを作成してシートのXMLに書き込む
+    '''
+    # 動作を確認したopenpyxlのバージョン
+    # openpyxlの内部のクラス(WorksheetWriter・ExcelWriter・write_cell)を継承・使用しているため、
+    # requirements.txtのバージョンを変更する場合は、openpyxlの保存結果と一致することを確認して追加する
+    SUPPORTED_OPENPYXL_VERSIONS = ('3.1.2',)
+
+    '''
+    インストールされているopenpyxlのバージョンでダイレクト出力モードを使用できるか判定する関数
+    '''
+    @staticmethod
+    def is_supported():
+        return openpyxl.__version__ in DirectSheetWriter.SUPPORTED_OPENPYXL_VERSIONS
+
+    '''
+    ブックを保存する関数
+    wb
+    ブックのオブジェクト
+    ws
+    VirtualRowsの行を書き込むシート
+    virtual_rows
+    VirtualRowsのリスト
+    path
+    保存するファイルのパス
+    '''
+    @staticmethod
+    def save(wb, ws, virtual_rows, path):
+        archive = ZipFile(path, 'w', ZIP_DEFLATED, allowZip64=True)
+        wb.properties.modified = datetime.datetime.utcnow()
+        writer = DirectExcelWriter(wb, archive, ws, virtual_rows)
+        writer.save()
@@ -0,0 +1,66 @@
+import codecs
+
+from pip._vendor.requests.help import chardet
+
+class EncodingDetector:
+    '''
+    ファイルの文字コードを判定するクラス
+    BOM⇒UTF-8⇒MS932の順に判定し、いずれでもない場合のみファイルの先頭をchardetで判定する
+    UTF-8の短い文字列はMS932としても読み込める場合があるため、判定の順番は常に同じとする
+    '''
+    # 文字コードの判定で一度に読み込むバイト数
+    CHUNK_SIZE = 65536
+    # chardetで判定する際に読み込むファイルの先頭のバイト数
+    SAMPLE_SIZE = 65536
+    # BOMと文字コード(UTF-32のBOMはUTF-16のBOMで始まるため先に判定)
+    BOMS = ((codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+            (codecs.BOM_UTF8, 'utf-8-sig'),
+            (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+    # BOMがない場合に順番に試す文字コード(UTF-8を必ず先に判定する)
+    CANDIDATES = ('utf-8', 'MS932')
+
+    '''
+    ファイルの文字コードを判定する関数
+    file_path
+    対象のファイルのパス
+    戻り値
+    文字コード
+    '''
+    @staticmethod
+    def detect(file_path):
+        # BOMのチェック
+        with open(file_path, 'rb') as file:
+            head = file.read(4)
+        for bom, encoding in EncodingDetector.BOMS:
+            if head.startswith(bom):
+                return encoding
+
+        # UTF-8⇒MS932の順番に試す
+        for encoding in EncodingDetector.CANDIDATES:
+            if EncodingDetector.can_decode(file_path, encoding):
+                return encoding
+
+        # いずれの文字コードでも読み込めない場合、ファイルの先頭のみchardetで判定
+        with open(file_path, 'rb') as file:
+            sample = file.read(EncodingDetector.SAMPLE_SIZE)
+        return chardet.detect(sample)['encoding'] or 'utf-8'
+
+    '''
+    ファイル全体を指定した文字コードで読み込めるかチェックする関数
+    ファイルを少しずつ読み込むため、ファイル全体を保持しない
+    file_path
+    対象のファイルのパス
+    encoding
+    文字コード
+    '''
+    @staticmethod
+    def can_decode(file_path, encoding):
+        decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+        try:
+            with open(file_path, 'rb') as file:
+                for raw_data in iter(lambda: file.read(EncodingDetector.CHUNK_SIZE), b''):
+                    decoder.decode(raw_data)
+                decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+        return True
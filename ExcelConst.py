@@ -29,6 +29,8 @@ class ExcelConst(metaclass=ExcelConstMeta):
     TEMPLATE_FOLDER_NAME = 'template'
     # 対象のシート名
     SHEET_NAME = 'API'
+    # ディシジョンテーブルの作成履歴を記録するファイル名
+    MANIFEST_FILE_NAME = 'decision_table_manifest.json'
 
     # 名前付き範囲の名称
     AREA_NAME_CASEAREA = 'ケースエリア'
@@ -51,4 +53,9 @@ class ExcelConst(metaclass=ExcelConstMeta):
     # IDやURL等が記載されている開始行
     TITLE_MIN_ROW = 2
     # IDやURL等が記載されている終了行
-    TITLE_MAX_ROW = 4 
\ No newline at end of file
+    TITLE_MAX_ROW = 4
+
+    # シートの最大行
+    SHEET_MAX_ROW = 1048576
+    # シートの最大列
+    SHEET_MAX_COL = 16384
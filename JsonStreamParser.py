@@ -0,0 +1,233 @@
+import re
+import json
+from json.decoder import scanstring
+
+# 一度に読み込む文字数
+CHUNK_SIZE = 65536
+
+# 空白文字
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# 数値
+NUMBER = re.compile(r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?')
+# 数値の続きになりうる文字
+NUMBER_CHARS = re.compile(r'[0-9.eE+-]*')
+# true/false/null、json.loadsで読み込める定数
+CONSTANTS = (('true', True), ('false', False), ('null', None),
+             ('NaN', float('nan')), ('Infinity', float('inf')), ('-Infinity', float('-inf')))
+# 定数の最大文字数
+CONSTANT_MAX_LEN = max(len(text) for text, value in CONSTANTS)
+# ファイルの途中で終わった場合のエラーメッセージ
+EOF_MESSAGES = {'first_key': 'Expecting property name enclosed in double quotes',
+                'key': 'Expecting property name enclosed in double quotes',
+                'colon': "Expecting ':' delimiter",
+                'next': "Expecting ',' delimiter"}
+
+
+def json_error(msg, buf, pos, consumed, lines, line_start):
+    '''
+    ファイル全体での位置を示したJSONDecodeErrorを作成する
+    msg(str)        :エラーメッセージ
+    buf(str)        :読み込み中の文字列
+    pos(int)        :buf内のエラー位置
+    consumed(int)   :bufより前に読み込み済みの文字数
+    lines(int)      :bufより前の改行数
+    line_start(int) :bufより前の最後の行の開始位置
+    '''
+    abs_pos = consumed + pos
+    lineno = lines + buf.count('\n', 0, pos) + 1
+    last_newline = buf.rfind('\n', 0, pos)
+    colno = pos - last_newline if last_newline >= 0 else abs_pos - line_start + 1
+    err = json.JSONDecodeError(msg, buf, pos)
+    err.args = (f'{msg}: line {lineno} column {colno} (char {abs_pos})',)
+    err.pos, err.lineno, err.colno = abs_pos, lineno, colno
+    return err
+
+
+def iter_json_events(file, chunk_size=CHUNK_SIZE):
+    '''
+    テキストファイルからJSONを少しずつ読み込み、イベントを1件ずつ返す
+    ファイル全体を読み込まないため、メモリ使用量は階層の深さと読み込み単位に比例する
+    file(TextIO)    :読み込むファイル
+    chunk_size(int) :一度に読み込む文字数
+    戻り値
+    (イベント, 値)
+        イベントは'start_map'、'map_key'(値はkey名)、'end_map'、'start_array'、'end_array'、'value'(値は文字列・数値・真偽値・None)
+    '''
+    buf = ''
+    pos = 0
+    eof = False
+    # エラー位置の計算用
+    consumed = lines = line_start = 0
+
+    # 開いている階層('map'または'array')
+    stack = []
+    # 次に読み込む要素
+    # value:値、first_value:配列の最初の値または']'、first_key:オブジェクトの最初のkeyまたは'}'
+    # key:key名、colon:':'、next:','または閉じ括弧、done:読み込み完了
+    state = 'value'
+
+    while True:
+        # 空白を読み飛ばす
+        pos = WHITESPACE.match(buf, pos).end()
+        if pos >= len(buf) - CONSTANT_MAX_LEN and not eof:
+            # 読み込み済みの部分を捨てて続きを読み込む
+            lines += buf.count('\n', 0, pos)
+            last_newline = buf.rfind('\n', 0, pos)
+            if last_newline >= 0:
+                line_start = consumed + last_newline + 1
+            consumed += pos
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        if pos >= len(buf):
+            if state == 'done':
+                return
+            raise json_error(EOF_MESSAGES.get(state, 'Expecting value'), buf, pos, consumed, lines, line_start)
+
+        char = buf[pos]
+        if state == 'done':
+            raise json_error('Extra data', buf, pos, consumed, lines, line_start)
+
+        if state == 'colon':
+            if char != ':':
+                raise json_error("Expecting ':' delimiter", buf, pos, consumed, lines, line_start)
+            pos += 1
+            state = 'value'
+            continue
+
+        if state == 'next':
+            if char == ',':
+                pos += 1
+                state = 'key' if stack[-1] == 'map' else 'value'
+                continue
+            if char == ('}' if stack[-1] == 'map' else ']'):
+                pos += 1
+                yield ('end_map' if stack.pop() == 'map' else 'end_array'), None
+                state = 'next' if stack else 'done'
+                continue
+            raise json_error("Expecting ',' delimiter", buf, pos, consumed, lines, line_start)
+
+        if state in ('key', 'first_key'):
+            if char == '}' and state == 'first_key':
+                pos += 1
+                stack.pop()
+                yield 'end_map', None
+                state = 'next' if stack else 'done'
+                continue
+            if char != '"':
+                raise json_error('Expecting property name enclosed in double quotes', buf, pos, consumed, lines, line_start)
+            try:
+                key, pos = scanstring(buf, pos + 1)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise json_error(e.msg, buf, e.pos, consumed, lines, line_start)
+                # key名が読み込み単位をまたぐ場合は続きを読み込んで再度処理する
+                buf, eof = read_more(file, buf, chunk_size)
+                continue
+            yield 'map_key', key
+            state = 'colon'
+            continue
+
+        # 値の読み込み
+        if char == ']' and state == 'first_value':
+            pos += 1
+            stack.pop()
+            yield 'end_array', None
+            state = 'next' if stack else 'done'
+            continue
+        if char == '{':
+            pos += 1
+            stack.append('map')
+            yield 'start_map', None
+            state = 'first_key'
+            continue
+        if char == '[':
+            pos += 1
+            stack.append('array')
+            yield 'start_array', None
+            state = 'first_value'
+            continue
+
+        if char == '"':
+            try:
+                value, end = scanstring(buf, pos + 1)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise json_error(e.msg, buf, e.pos, consumed, lines, line_start)
+                # 文字列が読み込み単位をまたぐ場合は続きを読み込んで再度処理する
+                buf, eof = read_more(file, buf, chunk_size)
+                continue
+        else:
+            match = NUMBER.match(buf, pos)
+            if match is not None and not eof and NUMBER_CHARS.match(buf, match.end()).end() == len(buf):
+                # 数値が読み込み単位をまたぐ可能性がある場合は続きを読み込んで再度処理する
+                # ('.'や'e'の直後で区切られた場合も、数値の途中で終わらないよう続きを読み込む)
+                buf, eof = read_more(file, buf, chunk_size)
+                continue
+            if match is not None:
+                integer, frac, exp = match.groups()
+                value = float(integer + (frac or '') + (exp or '')) if frac or exp else int(integer)
+                end = match.end()
+            else:
+                for text, constant in CONSTANTS:
+                    if buf.startswith(text, pos):
+                        value, end = constant, pos + len(text)
+                        break
+                else:
+                    raise json_error('Expecting value', buf, pos, consumed, lines, line_start)
+
+        pos = end
+        yield 'value', value
+        state = 'next' if stack else 'done'
+
+
+def read_more(file, buf, chunk_size):
+    '''
+    ファイルの続きを読み込んでbufの末尾に追加する
+    戻り値
+    (追加後の文字列, ファイルの末尾に達したか)
+    '''
+    chunk = file.read(chunk_size)
+    return buf + chunk, not chunk
+
+
+
+def build_value(events, event, value=None):
+    '''
+    イベントから値を組み立てる
+    events          :iter_json_eventsの戻り値
+    event, value    :組み立てる値の最初のイベントとその値
+    戻り値
+    組み立てた値(辞書・リスト・文字列・数値・真偽値・None)
+    '''
+    if event == 'value':
+        return value
+
+    root = {} if event == 'start_map' else []
+    # (組み立て中の辞書またはリスト, 辞書の場合は次に設定するkey名)
+    stack = [[root, None]]
+    for event, value in events:
+        container = stack[-1]
+        if event == 'map_key':
+            container[1] = value
+            continue
+        if event in ('end_map', 'end_array'):
+            stack.pop()
+            if not stack:
+                return root
+            continue
+
+        if event == 'start_map':
+            value = {}
+        elif event == 'start_array':
+            value = []
+        if isinstance(container[0], dict):
+            container[0][container[1]] = value
+        else:
+            container[0].append(value)
+        if event in ('start_map', 'start_array'):
+            stack.append([value, None])
+    return root
@@ -1,13 +1,100 @@
 import os 
 import re
 import sys
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-from pip._vendor.requests.help import chardet
-from typing import Set, Dict
+from typing import Dict
 
 import ConvertJsonToDecision as converter
 from logger import logger
+from EncodingDetector import EncodingDetector
+
+class FileNameIndex:
+    '''
+    フォルダ内のファイル名を一度だけ走査し、リクエスト・レスポンスのファイルを
+    (ケース, 更新種別, 何回目のAPIか, 種類, 拡張子)で引けるようにしたインデックス
+    ケースと何回目のAPIかは0始まりのインデックス
+    '''
+    # ファイル名:(request|response)_ケース番号(2桁)_更新種別_何回目のAPIか(1桁).拡張子
+    FILE_NAME_PATTERN = re.compile(r'(request|response)_(\d{2})_(C|R|U|D)_(\d)\.(txt|properties|json)')
+    # 種類ごとの拡張子
+    EXTENSIONS = {'request': ('txt', 'properties'), 'response': ('txt', 'json')}
+
+    def __init__(self, folder):
+        self.folder = folder
+        # (ファイル名, ファイルかどうか)のリスト(os.listdirと同じ順番)
+        self.files = []
+        # ファイル名:(ケース, 更新種別, 何回目のAPIか, 種類, 拡張子)
+        self.entries = {}
+        # (種類, ケース, 何回目のAPIか):ファイル名(同じ組み合わせが複数ある場合は最初のファイル)
+        self.lookup = {}
+
+        with os.scandir(folder) as it:
+            for entry in it:
+                self.files.append((entry.name, entry.is_file()))
+                result = FileNameIndex.FILE_NAME_PATTERN.match(entry.name)
+                if not result:
+                    continue
+                kind, case, verb, api, ext = result.groups()
+                if ext not in FileNameIndex.EXTENSIONS[kind]:
+                    continue
+                key = (int(case) - 1, verb, int(api) - 1, kind, ext)
+                self.entries[entry.name] = key
+                self.lookup.setdefault((kind, key[0], key[2]), entry.name)
+
+    '''
+    ファイル名を取得する関数
+    kind
+    'request'または'response'
+    case_idx
+    ケースのインデックス
+    api_idx
+    何回目のAPIかのインデックス
+    戻り値
+    ファイル名(存在しない場合はNone)
+    '''
+    def find(self, kind, case_idx, api_idx):
+        return self.lookup.get((kind, case_idx, api_idx))
+
+    '''
+    指定した文字列から始まるファイル名の一覧を取得する関数
+    '''
+    def names_startwith(self, prefix):
+        return [name for name, is_file in self.files if name.startswith(prefix)]
+
+
+class FolderData:
+    '''
+    フォルダ内のリクエスト用・レスポンス用のファイルを読み込んだ結果
+    一度読み込んだ結果をケースの範囲で切り出して再利用する
+    '''
+    def __init__(self, request_data, response_data, case_num, api_num, message, start_case=0):
+        # [ケース][何回目のAPIか]のリクエスト用・レスポンス用のデータ
+        self.request_data = request_data
+        self.response_data = response_data
+        self.case_num = case_num
+        self.api_num = api_num
+        # エラーメッセージ(エラーがない場合は空文字)
+        self.message = message
+        # ファイルを読み込んだ最初のケースのインデックス(これより前のケースは読み込んでいない)
+        self.start_case = start_case
+
+    '''
+    指定したケースの範囲のデータを取得する関数
+    start
+    開始するケースのインデックス(読み込んだ最初のケースより前は指定できない)
+    end
+    終了するケースのインデックス(このケースは含まない、省略時は最後のケースまで)
+    戻り値
+    (リクエスト用のデータ, レスポンス用のデータ)
+    '''
+    def cases(self, start, end=None):
+        if start < self.start_case:
+            raise ValueError(f'ケース{start + 1}より前のファイルは読み込んでいません')
+        return self.request_data[start:end], self.response_data[start:end]
+
 
 class LoadInputFile:
     '''
@@ -26,17 +113,20 @@ class LoadInputFile:
     ファイル名をチェックする関数
     folder
     フォルダのパス
+    index
+    フォルダのFileNameIndex(省略時はフォルダを走査して作成)
     '''
     @staticmethod
-    def check_filename(folder):
+    def check_filename(folder, index=None):
         # フォルダ内にあるファイルをチェックする
         err_flag = False
-        file_list = os.listdir(folder)
-        for file in file_list:
-            if os.path.isfile(os.path.join(folder, file)) and file.lower().startswith('request_'):
+        if index is None:
+            index = FileNameIndex(folder)
+        for file, is_file in index.files:
+            if is_file and file.lower().startswith('request_'):
                 # ファイルの場合、かつファイル名が「request_」から始まる場合
                 result = LoadInputFile.check_request_file(file)
-            elif os.path.isfile(os.path.join(folder, file)) and file.lower().startswith('response_'):
+            elif is_file and file.lower().startswith('response_'):
                 # ファイルの場合、かつファイル名が「response_」から始まる場合
                 result = LoadInputFile.check_response_file(file)
 
@@ -139,36 +229,59 @@ class LoadInputFile:
     プロパティ用のデータとレスポンス用のデータを作成する関数
     folder
     フォルダのパス
+    index
+    フォルダのFileNameIndex(省略時はフォルダを走査して作成)
+    worker_num
+    ファイルを並列に読み込む数(1以下の場合は直列に読み込む)
+    worker_type
+    'thread'の場合はスレッド、'process'の場合はプロセスで並列に読み込む
+    戻り値
+    (リクエスト用のデータ, レスポンス用のデータ, ケース数, APIの呼び出し回数, エラーメッセージ)
+    '''
+    @staticmethod
+    def create_data(folder, index=None, worker_num=1, worker_type='thread'):
+        folder_data = LoadInputFile.load_folder(folder, index, worker_num, worker_type)
+        return folder_data.request_data, folder_data.response_data, folder_data.case_num, folder_data.api_num, folder_data.message
+
+    '''
+    フォルダ内のリクエスト用・レスポンス用のファイルを読み込む関数
+    folder
+    フォルダのパス
+    index
+    フォルダのFileNameIndex(省略時はフォルダを走査して作成)
+    worker_num
+    ファイルを並列に読み込む数(1以下の場合は直列に読み込む)
+    worker_type
+    'thread'の場合はスレッド、'process'の場合はプロセスで並列に読み込む
+    start_case
+    読み込みを開始するケースのインデックス(これより前のケースのファイルは読み込まない)
+    戻り値
+    FolderData
     '''
     @staticmethod
-    def create_data(folder):
+    def load_folder(folder, index=None, worker_num=1, worker_type='thread', start_case=0):
         '''
         ケース数とAPIの呼び出し回数を元にして、多次元配列を作成(array[ケース数][何回目のAPIか])
         
         '''
-        file_list = os.listdir(folder)
-
-        # リクエストとレスポンスのファイル名をそれぞれ取得
-        request_list = [ temp for temp in file_list if temp.startswith('request_')]
-        response_list = [ temp for temp in file_list if temp.startswith('response_')]
+        if index is None:
+            index = FileNameIndex(folder)
 
         # APIの呼び出し回数とケース数の最大数を取得
-        api_num, case_num = LoadInputFile.count_maxcase_maxapi(request_list)
+        api_num, case_num = LoadInputFile.count_maxcase_maxapi(index)
+        # 読み込むファイルの一覧(ケース, 何回目のAPIか, 種類, ファイル名)
+        tasks = []
 
         result_request = [[{} for j in range(api_num)] for i in range(case_num)]
         result_response = [['' for j in range(api_num)] for i in range(case_num)]
 
         # ケース数分、ループ処理
-        for i in range(case_num):
+        for i in range(start_case, case_num):
             # APIの呼び出し回数分、ループ処理
             for j in range(api_num):
-                # ファイル名を生成
-                case = str(i+1).zfill(2)
-                regex = f'request_{case}_(C|R|U|D)_{j+1}.(txt|properties)'
-
                 # リクエスト用のファイルが存在しているかチェック
-                file_name = [temp for temp in request_list if re.match(regex, temp)]
-                if len(file_name) == 0:
+                file_name = index.find('request', i, j)
+                if file_name is None:
                     '''
                     特定のケースではセッションに値を設定した後、テスト対象のAPIを実行するケース等が存在する
                     APIの呼び出し回数分ループ処理を行うので特定のケースは1回目のリクエストと2回目のリクエストファイルが存在し、
@@ -178,15 +291,12 @@ class LoadInputFile:
                     # 対応しているファイルがない場合、値に「None」を設定
                     result_request[i][j] = None
                     continue
-                # リクエスト用のファイルを読み込んでDict型のデータに編集
-                data = LoadInputFile.load_properties(folder, file_name[0])
-                result_request[i][j] = data
+                # リクエスト用のファイルを読み込み対象に追加
+                tasks.append((i, j, 'request', file_name))
 
                 # レスポンス用のファイルが存在しているかチェック
-                file_name = []
-                regex = f'response_{case}_(C|R|U|D)_{j+1}.(txt|json)'
-                file_name = [temp for temp in response_list if re.match(regex, temp)]
-                if len(file_name) == 0:
+                file_name = index.find('response', i, j)
+                if file_name is None:
                     '''
                     特定のケースではセッションに値を設定した後、テスト対象のAPIを実行するケース等が存在する
                     APIの呼び出し回数分ループ処理を行うので特定のケースは1回目のリクエストと2回目のリクエストファイルが存在し、
@@ -197,36 +307,102 @@ class LoadInputFile:
                     result_response[i][j] = None
                     continue
 
-                # レスポンス用のファイルを読み込み、ディシジョンテーブルに貼り付けられる形式にデータを変換する
-                data = []
-                data, message = converter.conv_response_to_decision(folder, file_name[0])
-                if message != '':
-                    return None, None, None, None, message
-                
+                # レスポンス用のファイルを読み込み対象に追加
+                tasks.append((i, j, 'response', file_name))
+
+        # ファイルを読み込み、ケース・APIの順番に結果を設定する
+        # エラーがある場合は、ケース・APIの順番で最初のエラーメッセージを返す
+        results = LoadInputFile.map_load_file(folder, [(kind, file_name) for i, j, kind, file_name in tasks], worker_num, worker_type)
+        for (i, j, kind, file_name), (data, message) in zip(tasks, results):
+            if message != '':
+                results.close()
+                return FolderData(None, None, None, None, message)
+
+            if kind == 'request':
+                result_request[i][j] = data
+            else:
                 result_response[i][j] = data
         
-        return result_request, result_response, case_num, api_num, ''
+        return FolderData(result_request, result_response, case_num, api_num, '', start_case)
+
+    '''
+    1ファイル分のリクエスト用・レスポンス用のファイルを読み込む関数
+    folder
+    フォルダのパス
+    kind
+    'request'または'response'
+    file_name
+    ファイル名
+    戻り値
+    (読み込んだデータ, エラーメッセージ)
+    '''
+    @staticmethod
+    def load_file(folder, kind, file_name):
+        if kind == 'request':
+            # リクエスト用のファイルを読み込んでDict型のデータに編集
+            return LoadInputFile.load_properties(folder, file_name), ''
+        # レスポンス用のファイルを読み込み、ディシジョンテーブルに貼り付けられる形式にデータを変換する
+        return converter.conv_response_to_decision(folder, file_name)
+
+    '''
+    複数のファイルを読み込み、指定した順番で結果を返す関数
+    並列に読み込む場合も、結果は指定した順番で返す
+    folder
+    フォルダのパス
+    files
+    (種類, ファイル名)のリスト
+    worker_num
+    ファイルを並列に読み込む数(1以下の場合は直列に読み込む)
+    worker_type
+    'thread'の場合はスレッド、'process'の場合はプロセスで並列に読み込む
+    ※プロセスプールの子プロセスから呼び出された場合はスレッドで読み込む
+    '''
+    @staticmethod
+    def map_load_file(folder, files, worker_num=1, worker_type='thread'):
+        if worker_num <= 1 or len(files) <= 1:
+            # 直列に読み込む
+            for kind, file_name in files:
+                yield LoadInputFile.load_file(folder, kind, file_name)
+            return
+
+        if worker_type == 'process' and multiprocessing.parent_process() is None:
+            executor = ProcessPoolExecutor(max_workers=worker_num)
+        else:
+            executor = ThreadPoolExecutor(max_workers=worker_num)
+        try:
+            futures = [executor.submit(LoadInputFile.load_file, folder, kind, file_name) for kind, file_name in files]
+            for future in futures:
+                yield future.result()
+        finally:
+            # 途中で終了した場合は読み込み前のファイルを取り消す
+            executor.shutdown(wait=True, cancel_futures=True)
     
 
     '''
+    ディシジョンテーブルから取得したパラメータに、ファイルから読み込んだ追加分のケースのパラメータを設定する関数
+    folder
+    フォルダのパス
+    original_case_num
+    ディシジョンテーブルに記載されているケース数
+    folder_data
+    読み込み済みのFolderData(省略時は追加分のケースのファイルのみ読み込む)
     '''
     @staticmethod
-    def load_data(folder, original_case_num, case_num, api_num, request_data, response_data):
-        result = LoadInputFile.create_data(folder)
-        # ケース数文、ループ処理
-        for case_idx in range(0, case_num):
-            if case_idx > original_case_num - 1:
-                # case_idがディシジョンテーブルに記載されているケース数より多い場合に以下の処理を行う
-                # ※ディシジョンテーブルに記載されているパラメータは取得済みのため
-                for api_idx in range(0, api_num):
-                    if result[0][case_idx][api_idx] is None:
-                        continue
-                    request_data[case_idx][api_idx] = result[0][case_idx][api_idx]
-
-                    if result[1][case_idx][api_idx] is None:
-                        continue
-                    response_data[case_idx][api_idx] = result[1][case_idx][api_idx]
-                return request_data, response_data
+    def load_data(folder, original_case_num, case_num, api_num, request_data, response_data, folder_data=None):
+        if folder_data is None:
+            folder_data = LoadInputFile.load_folder(folder, start_case=original_case_num)
+        # ディシジョンテーブルに記載されているパラメータは取得済みのため、追加分のケースのみ処理する
+        result_request, result_response = folder_data.cases(original_case_num, case_num)
+        for case_idx, (request_case, response_case) in enumerate(zip(result_request, result_response), start=original_case_num):
+            for api_idx in range(0, api_num):
+                if request_case[api_idx] is None:
+                    continue
+                request_data[case_idx][api_idx] = request_case[api_idx]
+
+                if response_case[api_idx] is None:
+                    continue
+                response_data[case_idx][api_idx] = response_case[api_idx]
+        return request_data, response_data
             
     '''
     プロパティファイルをロードする関数
@@ -240,50 +416,48 @@ class LoadInputFile:
         path = f'{path}\{file}'
 
         # ファイルの文字コードを検出
-        with open(path, 'rb') as file:
-            raw_data = file.read()
-            result = chardet.detect(raw_data)
-            encoding = result['encoding']
+        encoding = EncodingDetector.detect(path)
 
         # 読み込み
         with open(path, 'r', encoding=encoding) as file:
             lines = file.readlines()
 
         # 読み込んだプロパティ用のファイルのデータを辞書型に変換
-        data: Dict[str, Set[int]] = {}
+        # 値はファイルの行の順番を保ったまま重複を除く(ハッシュ値のシードによらず行の並びを同じにする)
+        data: Dict[str, Dict[str, None]] = {}
         for line in lines:
             line = line.strip()
             if '=' in line:
                 key, value = line.split('=', 1)
                 if key not in data:
-                    data[key] = set()
-                data[key].add(value)
+                    data[key] = {}
+                data[key][value] = None
 
         return data
     
     '''
     ファイルの一覧からAPIの呼び出し回数とケース数を取得する関数
-    file_list
-    読み込んだファイルの一覧
+    index
+    フォルダのFileNameIndex
     '''
     @staticmethod
-    def count_maxcase_maxapi(file_list):
+    def count_maxcase_maxapi(index):
         # APIを何回呼び出すかをファイル名から取得
         api_num = 0
         case_num = 0
-        for temp in file_list:
-            api_num_match = re.search(r'(request_\d{2}_(C|R|U|D)_)(\d{1}).(txt|properties)', temp)
-            case_num_match = re.search(r'(request_)(\d{2})(_(C|R|U|D)_\d{1}).(txt|properties)', temp)
-            if not (api_num_match or case_num_match):
+        for temp in index.names_startwith('request_'):
+            key = index.entries.get(temp)
+            if key is None:
                 logger.error('ファイル名に不備があります')
-                err_flag = True
+                continue
+            case_idx, verb, api_idx, kind, ext = key
             
             # apiの呼び出し回数を更新
-            if api_num < int(api_num_match.group(3)):
-                api_num = int(api_num_match.group(3))
+            if api_num < api_idx + 1:
+                api_num = api_idx + 1
 
             # ケース数を更新
-            if case_num < int(case_num_match.group(2)):
-                case_num = int(case_num_match.group(2))
+            if case_num < case_idx + 1:
+                case_num = case_idx + 1
         
         return api_num, case_num
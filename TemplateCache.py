@@ -0,0 +1,97 @@
+import io
+import os
+import sys
+import pickle
+import copyreg
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from copy import deepcopy
+
+import openpyxl
+from openpyxl.utils.bound_dictionary import BoundDictionary
+from openpyxl.utils.indexed_list import IndexedList
+from openpyxl.worksheet.table import TableList
+
+'''
+pickle化したブックを復元する際に使用する関数
+openpyxlの一部のクラスは標準のpickle化では正しく復元されないため、個別に復元する
+'''
+def restore_indexed_list(values):
+    return IndexedList(values)
+
+def restore_table_list(tables):
+    table_list = TableList()
+    for name, table in tables:
+        dict.__setitem__(table_list, name, table)
+    return table_list
+
+def restore_bound_dictionary(cls, default_factory):
+    # 属性と要素はpickleの標準の処理で復元する
+    bound_dictionary = cls.__new__(cls)
+    BoundDictionary.__init__(bound_dictionary, None, default_factory)
+    return bound_dictionary
+
+'''
+pickle化する際に使用する関数
+'''
+def reduce_indexed_list(obj):
+    # 要素を追加する際に内部の辞書を参照するため、コンストラクタで一括して復元する
+    return restore_indexed_list, (list(obj),)
+
+def reduce_table_list(obj):
+    # items()がテーブル名と参照範囲を返すため、テーブルのオブジェクトをそのまま渡す
+    return restore_table_list, (list(dict.items(obj)),)
+
+def reduce_bound_dictionary(obj):
+    # 標準の処理では要素を生成する関数が引き継がれないため、個別に渡す
+    return restore_bound_dictionary, (type(obj), obj.default_factory), obj.__dict__, None, iter(dict.items(obj))
+
+class TemplateCache:
+    '''
+    テンプレートのブックをプロセス単位でキャッシュするクラス
+    ファイルの読み込みは1回だけ行い、2回目以降はpickle化したデータから複製する
+    '''
+    # テンプレートのパス：(更新日時, ブックをpickle化したデータ, テンプレートから作成したインデックス)
+    cache = {}
+
+    '''
+    テンプレートのブックを複製して取得する関数
+    template_path
+    テンプレートファイルのパス
+    create_index
+    ブックからインデックス(名前付き範囲の一覧等)を作成する関数
+    テンプレートの読み込み時に1回だけ実行し、結果をキャッシュする
+    戻り値
+    (ブック, インデックスの複製)
+    '''
+    @staticmethod
+    def load(template_path, create_index):
+        template_path = os.path.abspath(template_path)
+        mtime = os.path.getmtime(template_path)
+
+        cache = TemplateCache.cache.get(template_path)
+        if cache is None or cache[0] != mtime:
+            # 未読み込み、もしくはテンプレートが更新されている場合は読み込み直す
+            wb = openpyxl.load_workbook(template_path)
+            cache = (mtime, TemplateCache.dumps(wb), create_index(wb))
+            TemplateCache.cache[template_path] = cache
+
+        return pickle.loads(cache[1]), deepcopy(cache[2])
+
+    '''
+    ブックをpickle化する関数
+    wb
+    ブックのオブジェクト
+    '''
+    @staticmethod
+    def dumps(wb):
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+        pickler.dispatch_table = copyreg.dispatch_table.copy()
+        pickler.dispatch_table[IndexedList] = reduce_indexed_list
+        pickler.dispatch_table[TableList] = reduce_table_list
+        pickler.dispatch_table[BoundDictionary] = reduce_bound_dictionary
+        for cls in BoundDictionary.__subclasses__():
+            pickler.dispatch_table[cls] = reduce_bound_dictionary
+        pickler.dump(wb)
+        return buffer.getvalue()
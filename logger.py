@@ -1,5 +1,6 @@
 import logging
 import os
+import multiprocessing
 
 logger = logging.getLogger('my_log')
 logger.setLevel(logging.DEBUG)
@@ -10,7 +11,9 @@ format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s
 console.setFormatter(format)
 logger.addHandler(console)
 
-error_handler = logging.FileHandler('error.log',mode='w',encoding='utf-8')
+# 並列処理の子プロセスではログファイルを上書きしない
+mode = 'w' if multiprocessing.parent_process() is None else 'a'
+error_handler = logging.FileHandler('error.log',mode=mode,encoding='utf-8')
 error_handler.setLevel(logging.ERROR)
 error_handler.setFormatter(format)
 logger.addHandler(error_handler)
\ No newline at end of file
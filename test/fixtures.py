@@ -0,0 +1,80 @@
+import os
+import sys
+import shutil
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ExcelConst import ExcelConst as const
+
+# リポジトリのテンプレートのフォルダ
+TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'decision_tables', const.TEMPLATE_FOLDER_NAME))
+
+
+'''
+テスト用のdecision_tablesフォルダを作成する関数
+テンプレートのフォルダをコピーする
+root
+作成先のフォルダ
+戻り値
+decision_tablesフォルダのパス
+'''
+def create_tables_dir(root):
+    tables_dir = os.path.join(root, 'decision_tables')
+    shutil.copytree(TEMPLATE_DIR, os.path.join(tables_dir, const.TEMPLATE_FOLDER_NAME))
+    return tables_dir
+
+
+'''
+入力ファイルを作成する関数
+ツールはフォルダとファイル名を'\\'で結合して読み込むため、Windows以外では結合したパスにも同じ内容を書き込む
+'''
+def write_input(folder, file_name, text):
+    paths = {os.path.join(folder, file_name), f'{folder}\\{file_name}'}
+    for path in paths:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+
+'''
+ASTAIDのフォルダを作成する関数
+tables_dir
+decision_tablesフォルダのパス
+asta_id
+フォルダ名(astaid_XXXX)
+inputs
+ファイル名:内容
+戻り値
+フォルダのパス
+'''
+def create_folder(tables_dir, asta_id, inputs):
+    folder = os.path.join(tables_dir, asta_id)
+    os.makedirs(folder)
+    for file_name, text in inputs.items():
+        write_input(folder, file_name, text)
+    return folder
+
+
+'''
+ディシジョンテーブルの出力先のパスを取得する関数
+'''
+def output_path(folder):
+    return f'{folder}\\decision_table_{os.path.basename(folder).lower()}.xlsx'
+
+
+'''
+ディシジョンテーブルの内容を比較用の文字列のリストに変換する関数
+名前付き範囲・入力規則・条件付き書式・結合セル・行の高さ・列の幅・セルの値とスタイルを出力する
+'''
+def dump_workbook(wb):
+    ws = wb[const.SHEET_NAME]
+    lines = [f'name {name} {defined_name.attr_text}' for name, defined_name in sorted(wb.defined_names.items())]
+    lines += [f'dv {dv.sqref} {dv.formula1}' for dv in ws.data_validations.dataValidation]
+    lines += [f'cf {cf.sqref} {[rule.formula for rule in cf.rules]}' for cf in ws.conditional_formatting]
+    lines += [f'merged {merged}' for merged in sorted(str(merged) for merged in ws.merged_cells.ranges)]
+    lines.append(f'heights {sorted((row, dim.height) for row, dim in ws.row_dimensions.items() if dim.height)}')
+    lines.append(f'widths {sorted((col, dim.width) for col, dim in ws.column_dimensions.items() if dim.width)}')
+    for row in ws.iter_rows():
+        for cell in row:
+            if cell.value is not None or cell.has_style:
+                lines.append(f'{cell.coordinate} {cell.value!r} {cell.font!r} {cell.fill!r} {cell.border!r} '
+                             f'{cell.alignment!r} {cell.number_format}')
+    return lines
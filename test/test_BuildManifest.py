@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import fixtures
+import CreateDecisionExcel
+from BuildManifest import BuildManifest, NEW_FILE_MODE
+from ExcelConst import ExcelConst as const
+from LoadInputFile import FileNameIndex
+from logger import logger
+
+# テンプレートのケース数より多いケース
+INPUTS = {}
+for case in range(1, 4):
+    INPUTS[f'request_{case:02}_R_1.properties'] = f'kyakCifC={case}\n'
+    INPUTS[f'response_{case:02}_R_1.json'] = json.dumps({'status': 'SUCCESS', 'result': {'a': case}})
+
+
+class TestBuildManifest(unittest.TestCase):
+    '''
+    作成履歴による作成済みのディシジョンテーブルのスキップ・再作成の判定を確認するテスト
+    '''
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tables_dir = fixtures.create_tables_dir(self.temp_dir.name)
+        self.folder = fixtures.create_folder(self.tables_dir, 'astaid_0001', INPUTS)
+        self.template_path = os.path.join(self.tables_dir, const.TEMPLATE_FOLDER_NAME, const.TEMPLATE_FILE_NAME)
+        self.output_path = fixtures.output_path(self.folder)
+        self.manifest_path = f'{self.folder}\\{const.MANIFEST_FILE_NAME}'
+
+    def tearDown(self):
+        BuildManifest.generator_version = None
+        self.temp_dir.cleanup()
+
+    def create(self):
+        with mock.patch.object(logger, 'info') as info:
+            message = CreateDecisionExcel.create_decision_excel(self.folder)
+        skipped = any('スキップします' in call.args[0] for call in info.call_args_list)
+        return message, skipped
+
+    def is_up_to_date(self):
+        previous = BuildManifest.load(self.manifest_path)
+        manifest = BuildManifest.create(self.folder, FileNameIndex(self.folder), self.template_path, previous)
+        return BuildManifest.is_up_to_date(manifest, previous, self.output_path)
+
+    def touch(self, path, text):
+        # サイズと更新日時が同じ場合は前回のハッシュ値を使用するため、更新日時も変更する
+        stat = os.stat(path)
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(text)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def test_skip_when_unchanged(self):
+        self.assertEqual(self.create(), ('', False))
+        mtime = os.stat(self.output_path).st_mtime_ns
+        self.assertEqual(self.create(), ('', True))
+        self.assertEqual(os.stat(self.output_path).st_mtime_ns, mtime)
+
+    def test_regenerate_when_case_added(self):
+        self.create()
+        fixtures.write_input(self.folder, 'request_04_R_1.properties', 'kyakCifC=4\n')
+        fixtures.write_input(self.folder, 'response_04_R_1.json', json.dumps({'status': 'SUCCESS', 'result': {'a': 4}}))
+        self.assertEqual(self.create(), ('', False))
+        self.assertEqual(self.create(), ('', True))
+
+    def test_input_changed(self):
+        self.create()
+        self.assertTrue(self.is_up_to_date())
+        for file_name in {os.path.join(self.folder, 'request_01_R_1.properties'), f'{self.folder}\\request_01_R_1.properties'}:
+            self.touch(file_name, 'foo=1\n')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_input_removed(self):
+        self.create()
+        for path in {os.path.join(self.folder, 'response_02_R_1.json'), f'{self.folder}\\response_02_R_1.json'}:
+            os.remove(path)
+        self.assertFalse(self.is_up_to_date())
+
+    def test_template_changed(self):
+        self.create()
+        self.touch(self.template_path, ' ')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_output_changed(self):
+        self.create()
+        self.touch(self.output_path, ' ')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_output_removed(self):
+        self.create()
+        os.remove(self.output_path)
+        self.assertFalse(self.is_up_to_date())
+
+    def test_generator_changed(self):
+        self.create()
+        BuildManifest.generator_version = None
+        with mock.patch.object(BuildManifest, 'GENERATOR_MODULES', BuildManifest.GENERATOR_MODULES[:-1]):
+            self.assertFalse(self.is_up_to_date())
+
+    def test_version_changed(self):
+        self.create()
+        with mock.patch.object(BuildManifest, 'VERSION', BuildManifest.VERSION + 1):
+            self.assertIsNone(BuildManifest.load(self.manifest_path))
+
+    def test_broken_manifest(self):
+        self.create()
+        with open(self.manifest_path, 'w', encoding='utf-8') as file:
+            file.write('{')
+        with self.assertLogs(logger, 'WARNING'):
+            self.assertFalse(self.is_up_to_date())
+
+    def test_save_leaves_no_temp_file(self):
+        self.create()
+        manifest_dir = os.path.dirname(self.manifest_path)
+        self.assertEqual([name for name in os.listdir(manifest_dir) if name.endswith('.tmp')], [])
+        with open(self.manifest_path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['generator'], BuildManifest.get_generator_version())
+
+    @unittest.skipIf(os.name == 'nt', 'パーミッションはWindows以外で確認する')
+    def test_save_mode(self):
+        self.create()
+        self.assertEqual(os.stat(self.manifest_path).st_mode & 0o777, NEW_FILE_MODE)
+        os.chmod(self.manifest_path, 0o604)
+        fixtures.write_input(self.folder, 'request_04_R_1.properties', 'kyakCifC=4\n')
+        fixtures.write_input(self.folder, 'response_04_R_1.json', json.dumps({'status': 'SUCCESS', 'result': {'a': 4}}))
+        self.assertEqual(self.create(), ('', False))
+        self.assertEqual(os.stat(self.manifest_path).st_mode & 0o777, 0o604)
+
+
+if __name__ == '__main__':
+    unittest.main()
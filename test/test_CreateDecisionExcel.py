@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import openpyxl
+
+import fixtures
+import CreateDecisionExcel
+from DirectSheetWriter import DirectSheetWriter
+
+# 同じkey名に複数の値を持つケースを含む入力ファイル
+INPUTS = {}
+for case, values in enumerate((['alpha', 'beta'], ['gamma', 'delta', 'alpha'], ['delta', 'beta', 'epsilon']), start=1):
+    INPUTS[f'request_{case:02}_R_1.properties'] = ''.join(f'k={value}\n' for value in values) + f'kyakCifC={case}\n'
+    INPUTS[f'response_{case:02}_R_1.json'] = json.dumps({'status': 'SUCCESS', 'result': {'a': case, 'b': [case] * case}})
+
+# 別プロセスでディシジョンテーブルを作成し、内容を出力するスクリプト
+GENERATE_SCRIPT = '''
+import sys, json
+sys.path.insert(0, sys.argv[1])
+import fixtures, openpyxl, CreateDecisionExcel
+tables_dir = fixtures.create_tables_dir(sys.argv[2])
+folder = fixtures.create_folder(tables_dir, 'astaid_0001', json.loads(sys.argv[3]))
+message = CreateDecisionExcel.create_decision_excel(folder)
+print(json.dumps([message] + fixtures.dump_workbook(openpyxl.load_workbook(fixtures.output_path(folder)))))
+'''
+
+
+class TestCreateDecisionExcel(unittest.TestCase):
+    '''
+    作成したディシジョンテーブルの行の並びを確認するテスト
+    '''
+    def generate(self, hash_seed):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+            output = subprocess.run([sys.executable, '-c', GENERATE_SCRIPT, os.path.dirname(os.path.abspath(__file__)),
+                                     temp_dir, json.dumps(INPUTS)],
+                                    cwd=temp_dir, env=env, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.splitlines()[-1])
+
+    def test_layout_does_not_depend_on_hash_seed(self):
+        first = self.generate(1)
+        self.assertEqual(first[0], '')
+        for hash_seed in (2, 3, 4):
+            with self.subTest(hash_seed=hash_seed):
+                self.assertEqual(self.generate(hash_seed), first)
+
+    def test_request_values_keep_file_order(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tables_dir = fixtures.create_tables_dir(temp_dir)
+            folder = fixtures.create_folder(tables_dir, 'astaid_0001', INPUTS)
+            self.assertEqual(CreateDecisionExcel.create_decision_excel(folder), '')
+            ws = openpyxl.load_workbook(fixtures.output_path(folder))['API']
+            values = [row[5].value for row in ws.iter_rows() if row[3].value == 'k']
+        # 最初に出現したケース・行の順番
+        self.assertEqual(values, ['alpha', 'beta', 'gamma', 'delta', 'epsilon'])
+
+
+def create_inputs(case_num, api_num, start_case=1):
+    '''
+    ケース数・APIの呼び出し回数分のリクエスト用・レスポンス用のファイルの内容を作成する
+    ケースごとにkey名・値・配列の要素数を変え、パラメータの行の追加・削除が発生するようにする
+    '''
+    inputs = {}
+    for case in range(start_case, start_case + case_num):
+        for api in range(1, api_num + 1):
+            inputs[f'request_{case:02}_R_{api}.properties'] = f'kyakCifC={case}\nfoo{api}={case % 3}\nbar=x{case % 2}\n'
+            inputs[f'response_{case:02}_R_{api}.json'] = json.dumps(
+                {'status': 'SUCCESS', 'result': {'a': case % 2, f'api{api}': api, 'items': [{'k': i} for i in range(case % 4)]}})
+    return inputs
+
+
+class TestWriterMode(unittest.TestCase):
+    '''
+    ダイレクト出力モードで保存したディシジョンテーブルが、openpyxlで保存した場合と一致するか確認するテスト
+    '''
+    def generate(self, mode, steps):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tables_dir = fixtures.create_tables_dir(temp_dir)
+            folder = fixtures.create_folder(tables_dir, 'astaid_0001', {})
+            with mock.patch.object(CreateDecisionExcel, 'get_writer_mode', return_value=mode):
+                for inputs in steps:
+                    for file_name, text in inputs.items():
+                        fixtures.write_input(folder, file_name, text)
+                    self.assertEqual(CreateDecisionExcel.create_decision_excel(folder), '')
+                    # ツールは既存のディシジョンテーブルをフォルダ内から探すため、Windows以外では作成したファイルをフォルダ内にコピーする
+                    table_path = os.path.join(folder, 'decision_table_astaid_0001.xlsx')
+                    if table_path != fixtures.output_path(folder):
+                        shutil.copy(fixtures.output_path(folder), table_path)
+            return fixtures.dump_workbook(openpyxl.load_workbook(fixtures.output_path(folder)))
+
+    def assert_same_output(self, steps):
+        self.assertEqual(self.generate('direct', steps), self.generate('openpyxl', steps))
+
+    def test_supported_openpyxl(self):
+        self.assertTrue(DirectSheetWriter.is_supported(), f'openpyxl {openpyxl.__version__}')
+
+    def test_unsupported_openpyxl_falls_back(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'config.ini'), 'w', encoding='utf-8') as file:
+                file.write('[DEFAULT]\nCreateWriterMode = direct\n')
+            cwd = os.getcwd()
+            os.chdir(temp_dir)
+            try:
+                self.assertEqual(CreateDecisionExcel.get_writer_mode(), 'direct')
+                with mock.patch.object(openpyxl, '__version__', '0.0.0'):
+                    with self.assertLogs(CreateDecisionExcel.logger, 'WARNING'):
+                        self.assertEqual(CreateDecisionExcel.get_writer_mode(), 'openpyxl')
+            finally:
+                os.chdir(cwd)
+
+    def test_new_table(self):
+        self.assert_same_output([create_inputs(12, 1)])
+
+    def test_new_table_with_several_apis(self):
+        self.assert_same_output([create_inputs(5, 3)])
+
+    def test_update_existing_table(self):
+        self.assert_same_output([create_inputs(4, 1), create_inputs(3, 1, start_case=5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import DecisionTableToJson
+
+
+class TestWriteTextAtomic(unittest.TestCase):
+    '''
+    出力ファイルの書き込みを確認するテスト
+    '''
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'case.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def test_write_and_replace(self):
+        DecisionTableToJson.write_text_atomic(self.path, 'first', 'utf-8')
+        DecisionTableToJson.write_text_atomic(self.path, 'second', 'utf-8')
+        self.assertEqual(self.read(), 'second')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['case.json'])
+
+    @unittest.skipIf(os.name == 'nt', 'パーミッションはWindows以外で確認する')
+    def test_new_file_mode_follows_umask(self):
+        DecisionTableToJson.write_text_atomic(self.path, 'text', 'utf-8')
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o666 & ~DecisionTableToJson.UMASK)
+
+    @unittest.skipIf(os.name == 'nt', 'パーミッションはWindows以外で確認する')
+    def test_existing_file_mode_is_kept(self):
+        DecisionTableToJson.write_text_atomic(self.path, 'first', 'utf-8')
+        os.chmod(self.path, 0o604)
+        DecisionTableToJson.write_text_atomic(self.path, 'second', 'utf-8')
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o604)
+
+
+class TestExportCache(unittest.TestCase):
+    '''
+    内容が変わっていないファイルを書き込まない処理を確認するテスト
+    '''
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, 'output')
+        self.direct_dir = os.path.join(self.temp_dir.name, 'direct')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, json_objects, direct=False):
+        table = {
+            'err_flag': False,
+            'json_objects': json_objects,
+            'properties_objects': {'condition_1': {5: {'kyakCifC': '1'}, 6: {'kyakCifC': '2'}}},
+            'asta_id_values': ['astaid_0001'],
+            'column_to_test_case_no_map': {5: 1, 6: 2},
+        }
+        with mock.patch.multiple(DecisionTableToJson, directFlg=direct, directDir=self.direct_dir, exportCacheDir=''):
+            with mock.patch.object(DecisionTableToJson, 'write_text_atomic', wraps=DecisionTableToJson.write_text_atomic) as write:
+                self.assertTrue(DecisionTableToJson.write_decision_table(table, self.output_dir))
+        # 書き込んだ出力ファイルのファイル名(フィンガープリントの記録は除く)
+        paths = [call.args[0] for call in write.call_args_list]
+        return sorted(os.path.basename(path) for path in paths
+                      if os.path.basename(os.path.dirname(path)) != DecisionTableToJson.EXPORT_CACHE_DIR_NAME)
+
+    def json_objects(self, first='a', second='b'):
+        return {'condition_1': {5: {'status': first}, 6: {'status': second}}}
+
+    def test_skip_unchanged_files(self):
+        self.assertEqual(self.write(self.json_objects()), ['ASTAID_0001_001.properties', 'ASTAID_0001_002.properties',
+                                                           'Result_ASTAID_0001_001.json', 'Result_ASTAID_0001_002.json'])
+        self.assertEqual(self.write(self.json_objects()), [])
+
+    def test_rewrite_changed_case(self):
+        self.write(self.json_objects())
+        self.assertEqual(self.write(self.json_objects(second='c')), ['Result_ASTAID_0001_002.json'])
+        with open(os.path.join(self.output_dir, 'json', 'Result_ASTAID_0001_002.json'), encoding='utf-8') as file:
+            self.assertIn('"c"', file.read())
+
+    def test_rewrite_externally_modified_file(self):
+        self.write(self.json_objects())
+        path = os.path.join(self.output_dir, 'json', 'Result_ASTAID_0001_001.json')
+        stat = os.stat(path)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('edited')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertEqual(self.write(self.json_objects()), ['Result_ASTAID_0001_001.json'])
+
+    def test_rewrite_removed_file(self):
+        self.write(self.json_objects())
+        os.remove(os.path.join(self.output_dir, 'properties', 'ASTAID_0001_002.properties'))
+        self.assertEqual(self.write(self.json_objects()), ['ASTAID_0001_002.properties'])
+
+    def test_cache_is_outside_direct_output(self):
+        legacy_path = os.path.join(self.direct_dir, 'responseData', 'LT', 'ASTAID_0001', '.export_cache')
+        os.makedirs(os.path.dirname(legacy_path))
+        with open(legacy_path, 'w', encoding='utf-8') as file:
+            file.write('{}')
+
+        self.write(self.json_objects(), direct=True)
+        self.assertEqual(self.write(self.json_objects(), direct=True), [])
+        delivered = sorted(name for root, dirs, files in os.walk(self.direct_dir) for name in files)
+        self.assertEqual(delivered, ['ASTAID_0001_001.properties', 'ASTAID_0001_002.properties',
+                                     'Result_ASTAID_0001_001.json', 'Result_ASTAID_0001_002.json'])
+        self.assertTrue(os.listdir(os.path.join(self.output_dir, DecisionTableToJson.EXPORT_CACHE_DIR_NAME)))
+
+
+if __name__ == '__main__':
+    unittest.main()
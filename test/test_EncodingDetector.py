@@ -0,0 +1,66 @@
+import os
+import sys
+import codecs
+import tempfile
+import unittest
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from EncodingDetector import EncodingDetector
+from LoadInputFile import LoadInputFile
+
+# UTF-8のままMS932としても読み込める文字列
+UTF8_TEXT = 'name=ボけ\n'
+# MS932でのみ読み込める文字列
+MS932_TEXT = 'name=ボタン\nkey=値\n'
+
+
+class TestEncodingDetector(unittest.TestCase):
+    '''
+    文字コードが混在するフォルダで、ファイルの順番によらず正しい文字コードで読み込めるか確認するテスト
+    '''
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, 'astaid_0001')
+        os.makedirs(self.folder)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, file_name, text, encoding):
+        # ツールはフォルダとファイル名を'\\'で結合して読み込むため、Windows以外では結合したパスにも書き込む
+        for path in {os.path.join(self.folder, file_name), f'{self.folder}\\{file_name}'}:
+            with open(path, 'wb') as file:
+                file.write(text.encode(encoding))
+        return f'{self.folder}\\{file_name}'
+
+    def load_properties(self, file_name):
+        return {key: list(values) for key, values in LoadInputFile.load_properties(self.folder, file_name).items()}
+
+    def test_premise(self):
+        # UTF-8の文字列がMS932としても読み込めること(MS932を先に判定すると文字化けする)
+        self.assertNotEqual(UTF8_TEXT.encode('utf-8').decode('MS932'), UTF8_TEXT)
+
+    def test_mixed_encodings(self):
+        for order in (('ms932', 'utf8'), ('utf8', 'ms932')):
+            with self.subTest(order=order):
+                paths = {}
+                for name in order:
+                    if name == 'ms932':
+                        paths[name] = self.write('request_01_R_1.properties', MS932_TEXT, 'MS932')
+                    else:
+                        paths[name] = self.write('request_02_R_1.properties', UTF8_TEXT, 'utf-8')
+                    # 作成した順番に判定し、直前のファイルの判定結果が次のファイルに影響しないことを確認する
+                    EncodingDetector.detect(paths[name])
+
+                self.assertEqual(EncodingDetector.detect(paths['ms932']), 'MS932')
+                self.assertEqual(EncodingDetector.detect(paths['utf8']), 'utf-8')
+                self.assertEqual(self.load_properties('request_01_R_1.properties'), {'name': ['ボタン'], 'key': ['値']})
+                self.assertEqual(self.load_properties('request_02_R_1.properties'), {'name': ['ボけ']})
+
+    def test_bom(self):
+        path = self.write('request_01_R_1.properties', codecs.BOM_UTF8.decode('utf-8') + UTF8_TEXT, 'utf-8')
+        self.assertEqual(EncodingDetector.detect(path), 'utf-8-sig')
+
+
+if __name__ == '__main__':
+    unittest.main()
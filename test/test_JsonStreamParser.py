@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import json
+import unittest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from JsonStreamParser import iter_json_events, build_value
+from ConvertJsonToDecision import iter_conv_data, iter_conv_events
+
+# 数値・文字列が読み込み単位をまたぐ位置をすべて確認するためのJSON
+SAMPLES = (
+    '1234567890.5',
+    '123456789012e5',
+    '-98765.4321E+12',
+    '{"a": 1.2345678901234e-05, "b": [0, -0.5e+3, 7, 1e0], "c": "x\\"y\\u3042", "d": null}',
+    '{"status": "SUCCESS", "result": {"list": [{"v": 3.25}, {"v": -1E-7}], "empty": [], "flag": true}}',
+)
+
+
+class TestJsonStreamParser(unittest.TestCase):
+    '''
+    JsonStreamParserの読み込み結果がjson.loadsと一致するか確認するテスト
+    '''
+    def parse(self, text, chunk_size):
+        events = iter_json_events(io.StringIO(text), chunk_size)
+        event, value = next(events)
+        return build_value(events, event, value)
+
+    def test_every_chunk_size(self):
+        # 読み込み単位を1文字からJSON全体より長い文字数まで変えて読み込む
+        for text in SAMPLES:
+            expected = json.loads(text)
+            for chunk_size in range(1, len(text) + 2):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(self.parse(text, chunk_size), expected)
+
+    def test_conv_events_every_chunk_size(self):
+        for text in SAMPLES:
+            expected = json.loads(text)
+            if not isinstance(expected, dict):
+                continue
+            expected = dict(iter_conv_data(expected))
+            for chunk_size in range(1, len(text) + 2):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    events = iter_json_events(io.StringIO(text), chunk_size)
+                    self.assertEqual(dict(iter_conv_events(events)), expected)
+
+    def test_number_across_default_chunk(self):
+        # 既定の読み込み単位の境界が数値の'.'・'e'・'e-'の直後になる場合
+        for number in ('1234567890.5', '123456789012e5', '1.2345678901234e-05'):
+            for offset in range(1, len(number)):
+                text = '[' + ' ' * (65536 - 1 - offset) + number + ']'
+                with self.subTest(number=number, offset=offset):
+                    self.assertEqual(self.parse(text, 65536), json.loads(text))
+
+    def test_invalid_json(self):
+        for text in ('[1, 2', '{"a" 1}', '[1.]', '[01]'):
+            for chunk_size in range(1, len(text) + 2):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    with self.assertRaises(json.JSONDecodeError):
+                        self.parse(text, chunk_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import openpyxl
+
+import fixtures
+import CreateDecisionExcel
+from ExcelConst import ExcelConst as const
+from TemplateCache import TemplateCache
+
+
+def create_inputs(case_num, api_num):
+    '''
+    ケース数・APIの呼び出し回数分のリクエスト用・レスポンス用のファイルの内容を作成する
+    '''
+    inputs = {}
+    for case in range(1, case_num + 1):
+        for api in range(1, api_num + 1):
+            inputs[f'request_{case:02}_R_{api}.properties'] = f'kyakCifC={case}\nfoo{api}={case % 3}\n'
+            inputs[f'response_{case:02}_R_{api}.json'] = json.dumps(
+                {'status': 'SUCCESS', 'result': {'a': case % 2, 'items': [{'k': i} for i in range(case % 4)]}})
+    return inputs
+
+
+class TestTemplateCache(unittest.TestCase):
+    '''
+    キャッシュしたテンプレートから複製したブックが、他のフォルダの作成結果の影響を受けないか確認するテスト
+    '''
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tables_dir = fixtures.create_tables_dir(self.temp_dir.name)
+        TemplateCache.cache.clear()
+
+    def tearDown(self):
+        TemplateCache.cache.clear()
+        self.temp_dir.cleanup()
+
+    def create(self, asta_id, inputs):
+        folder = fixtures.create_folder(self.tables_dir, asta_id, inputs)
+        self.assertEqual(CreateDecisionExcel.create_decision_excel(folder), '')
+        return fixtures.dump_workbook(openpyxl.load_workbook(fixtures.output_path(folder)))
+
+    def test_second_folder_is_not_affected_by_first(self):
+        # 1つ目のフォルダでは行・列・APIのエリアを追加してテンプレートから大きく変更する
+        self.create('astaid_0001', create_inputs(8, 2))
+        second = self.create('astaid_0002', create_inputs(3, 1))
+
+        # キャッシュがない状態で作成した結果と一致すること
+        TemplateCache.cache.clear()
+        expected = self.create('astaid_0003', create_inputs(3, 1))
+        self.assertEqual(second, expected)
+
+    def test_cached_template_is_not_modified(self):
+        template_path = os.path.join(self.tables_dir, const.TEMPLATE_FOLDER_NAME, const.TEMPLATE_FILE_NAME)
+        self.create('astaid_0001', create_inputs(8, 2))
+
+        wb, index = TemplateCache.load(template_path, lambda wb: None)
+        self.assertEqual(fixtures.dump_workbook(wb), fixtures.dump_workbook(openpyxl.load_workbook(template_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()